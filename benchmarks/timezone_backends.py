@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the timezone backends on a year of zmanim.
+
+The cold times clear the timezone offset and Hebrew year caches before each
+run, so every conversion goes through the backend; the warm times reuse them.
+
+Run from the repository root with: python -m benchmarks.timezone_backends
+"""
+from __future__ import print_function
+
+import datetime
+import timeit
+
+from hdate import Location, Zmanim, common
+from hdate import converters as conv
+
+TIMEZONES = (
+    ("America/New_York", 40.7128, -74.0060),
+    ("Asia/Jerusalem", 31.778, 35.235),
+)
+REPEAT = 5
+
+
+def year_of_zmanim(location):
+    """Compute the local zmanim of every day of 2021."""
+    date = datetime.datetime(2021, 1, 1, 12)
+    while date.year == 2021:
+        Zmanim(date, location).zmanim
+        date += datetime.timedelta(days=1)
+
+
+def clear_caches():
+    """Drop the cached timezone offsets and Hebrew years."""
+    common.clear_offset_cache()
+    conv.clear_year_cache()
+
+
+def cold(location):
+    """Compute a year of zmanim with empty caches."""
+    clear_caches()
+    year_of_zmanim(location)
+
+
+def main():
+    """Print the best cold and warm cache times of each backend and timezone."""
+    print("{:<10} {:<18} {:>8} {:>8}".format("backend", "timezone", "cold", "warm"))
+    for backend in common.TIMEZONE_BACKENDS:
+        used = common.set_timezone_backend(backend)
+        for name, latitude, longitude in TIMEZONES:
+            location = Location(
+                name=name, latitude=latitude, longitude=longitude, timezone=name
+            )
+            best_cold = min(
+                timeit.repeat(lambda: cold(location), number=1, repeat=REPEAT)
+            )
+            best_warm = min(
+                timeit.repeat(
+                    lambda: year_of_zmanim(location), number=1, repeat=REPEAT
+                )
+            )
+            print(
+                "{:<10} {:<18} {:>7.3f}s {:>7.3f}s".format(
+                    used, name, best_cold, best_warm
+                )
+            )
+    common.set_timezone_backend("pytz")
+    clear_caches()
+
+
+if __name__ == "__main__":
+    main()
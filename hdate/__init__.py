@@ -5,8 +5,20 @@ HDate calculates and generates a represantation either in English or Hebrew
 of the Jewish calendrical date and times for a given location
 """
 from hdate.common import HebrewDate, Location
-from hdate.date import HDate
+from hdate.date import HDate, HebrewYear
 from hdate.htables import HolidayTypes
+from hdate.keviah import iter_range
+from hdate.timeline import melacha_timeline, next_transition
 from hdate.zmanim import Zmanim
 
-__all__ = ["HDate", "Zmanim", "HebrewDate", "Location", "HolidayTypes"]
+__all__ = [
+    "HDate",
+    "Zmanim",
+    "HebrewDate",
+    "HebrewYear",
+    "Location",
+    "HolidayTypes",
+    "iter_range",
+    "melacha_timeline",
+    "next_transition",
+]
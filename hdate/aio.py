@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asyncio scheduling of the transitions of many locations.
+
+The scheduler keeps the upcoming transition of every location in a heap, and a
+single timer on the event loop for the earliest of them. The transitions are
+read from the cached day tables of hdate.timeline, so new days are only
+computed once the previous ones are exhausted.
+"""
+import asyncio
+import datetime
+import heapq
+import logging
+
+import pytz
+
+from hdate.timeline import TRANSITION_KINDS, iter_transitions
+
+_LOGGER = logging.getLogger(__name__)
+
+# Every kind of transition happens at least once a Hebrew year, so looking
+# further than this for a transition of the requested kinds is pointless.
+MAX_LOOKAHEAD = datetime.timedelta(days=400)
+
+
+def utc_now():
+    """Return the current time as an aware UTC datetime."""
+    return datetime.datetime.now(pytz.utc)
+
+
+class TransitionScheduler(object):
+    """
+    Call back on the transitions of a set of locations.
+
+    callback is called with the location and the TRANSITION once its time has
+    come. Only the transitions of the given kinds are reported, all of them by
+    default. The days up to the next transition of a location are computed
+    when it is queued, so a rare kind such as "omer" may have start() compute
+    up to a year of days for each location.
+
+    clock returns the current time as an aware datetime, and is used with
+    loop to schedule the timer; both can be replaced for testing. Without a
+    loop, start() must be called from the running event loop, or uses the
+    current event loop before Python 3.7. The keyword
+    arguments are passed to hdate.timeline.day_transitions().
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, locations, callback, kinds=None, loop=None, clock=utc_now, **kwargs
+    ):
+        """Initialize a stopped scheduler."""
+        if kinds is not None:
+            if not kinds:
+                raise ValueError("No transition kinds to report")
+            if not set(kinds) <= set(TRANSITION_KINDS):
+                raise ValueError("Unknown transition kinds: {}".format(kinds))
+        self.locations = list(locations)
+        self.callback = callback
+        self.kinds = kinds
+        self.loop = loop
+        self.clock = clock
+        self._kwargs = kwargs
+        self._iterators = []
+        self._pending = []
+        self._handle = None
+        self._stopped = True
+
+    @property
+    def running(self):
+        """Return whether the scheduler was started and not stopped."""
+        return self._handle is not None
+
+    @property
+    def next_time(self):
+        """Return the time of the next transition reported, or None."""
+        return self._pending[0][0] if self._pending else None
+
+    def start(self):
+        """Compute the next transition of each location and start the timer."""
+        if self.loop is None:
+            # asyncio.get_running_loop() only exists from Python 3.7
+            get_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+            self.loop = get_loop()
+        self._stopped = False
+        now = self.clock()
+        self._iterators = [
+            iter_transitions(location, now, **self._kwargs)
+            for location in self.locations
+        ]
+        self._pending = []
+        for index in range(len(self.locations)):
+            self._push(index)
+        self._schedule()
+
+    def stop(self):
+        """Cancel the timer, also when called back from it."""
+        self._stopped = True
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _push(self, index):
+        """Queue the next reported transition of the location of index."""
+        horizon = self.clock() + MAX_LOOKAHEAD
+        for transition in self._iterators[index]:
+            if transition.time > horizon:
+                _LOGGER.warning(
+                    "No transition of kinds %s for %r",
+                    self.kinds,
+                    self.locations[index],
+                )
+                return
+            if self.kinds is None or transition.kind in self.kinds:
+                heapq.heappush(self._pending, (transition.time, index, transition))
+                return
+
+    def _schedule(self):
+        """Set the single timer to the time of the next transition."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._pending:
+            return
+        delay = (self._pending[0][0] - self.clock()).total_seconds()
+        self._handle = self.loop.call_at(self.loop.time() + max(delay, 0), self._fire)
+
+    def _fire(self):
+        """Report the transitions whose time has come and reschedule."""
+        self._handle = None
+        now = self.clock()
+        while not self._stopped and self._pending and self._pending[0][0] <= now:
+            _, index, transition = heapq.heappop(self._pending)
+            self._push(index)
+            try:
+                self.callback(self.locations[index], transition)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error calling back on %r", transition)
+        if not self._stopped:
+            self._schedule()
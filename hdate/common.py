@@ -1,16 +1,30 @@
 """Small helper classes."""
 
 import datetime
+import math
 import sys
+import threading
+from collections import OrderedDict, namedtuple
 
 import pytz
 
 from hdate.htables import Months
 
+try:
+    import zoneinfo
+except ImportError:  # pragma: no cover
+    zoneinfo = None
+
+TIMEZONE_BACKENDS = ("pytz", "zoneinfo")
+_TIMEZONE_BACKEND = "pytz"
+
 
 class BaseClass(object):  # pylint: disable=useless-object-inheritance
     """Implement basic functionality for all classes."""
 
+    # Attributes memoizing computed values, these are ignored on comparison.
+    _cached_attrs = ()
+
     def __str__(self):
         """Return a string representation."""
         if sys.version_info.major < 3:
@@ -26,14 +40,194 @@ class BaseClass(object):  # pylint: disable=useless-object-inheritance
     def __eq__(self, other):
         """Override equality operator."""
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self._state() == other._state()
         return False
 
+    def _state(self):
+        """Return the attributes defining the object, without memoized values."""
+        return {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in self._cached_attrs
+        }
+
     def __ne__(self, other):
         """Override inequality operator."""
         return not self.__eq__(other)
 
 
+def set_timezone_backend(name):
+    """
+    Select the library creating the timezones given by name.
+
+    The backend is either "pytz", the default, or "zoneinfo" from the
+    standard library, which falls back to pytz when it is unavailable.
+    Timezones already created are not affected. Return the backend in use.
+    """
+    global _TIMEZONE_BACKEND  # pylint: disable=global-statement
+    if name not in TIMEZONE_BACKENDS:
+        raise ValueError("Unknown timezone backend: {}".format(name))
+    if name == "zoneinfo" and zoneinfo is None:  # pragma: no cover
+        name = "pytz"
+    _TIMEZONE_BACKEND = name
+    return name
+
+
+def get_timezone_backend():
+    """Return the name of the timezone backend in use."""
+    return _TIMEZONE_BACKEND
+
+
+def get_timezone(value):
+    """Return the tzinfo object of a timezone given by name or as tzinfo."""
+    if isinstance(value, datetime.tzinfo):
+        return value
+    if _TIMEZONE_BACKEND == "zoneinfo":
+        return zoneinfo.ZoneInfo(value)
+    return pytz.timezone(value)
+
+
+def localize(tz, value):
+    """
+    Attach the timezone tz to the naive datetime value.
+
+    pytz timezones must localize the value to pick its offset, other tzinfo
+    objects are attached to it. Times repeated or skipped by a DST change are
+    resolved to standard time, as pytz does by default.
+    """
+    if hasattr(tz, "localize"):
+        return tz.localize(value)
+    first = value.replace(tzinfo=tz)
+    second = value.replace(tzinfo=tz, fold=1)
+    return second if first.dst() and not second.dst() else first
+
+
+CACHE_INFO = namedtuple("CACHE_INFO", "hits, misses, maxsize, currsize")
+
+
+class LRUCache(object):
+    """Bounded, thread-safe least recently used cache with statistics."""
+
+    def __init__(self, maxsize=128):
+        """Initialize an empty cache holding at most maxsize entries."""
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """Return the value cached for key, calling compute(key) on a miss."""
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value is not None:
+                self.hits += 1
+                self._data[key] = value
+                return value
+            self.misses += 1
+
+        value = compute(key)
+
+        with self._lock:
+            if self._maxsize > 0:
+                self._data[key] = value
+                self._trim()
+        return value
+
+    def _trim(self):
+        """Drop the least recently used entries until the cache fits maxsize."""
+        while len(self._data) > max(self._maxsize, 0):
+            self._data.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Change the maximal number of cached entries."""
+        with self._lock:
+            self._maxsize = maxsize
+            self._trim()
+
+    def clear(self):
+        """Empty the cache and reset its statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return the statistics of the cache."""
+        with self._lock:
+            return CACHE_INFO(self.hits, self.misses, self._maxsize, len(self._data))
+
+
+DAY_OFFSET = namedtuple("DAY_OFFSET", "utcoffset, tzinfo")
+
+# Timezone offsets of the days around a date, keyed by (tzinfo, date).
+_DAY_OFFSETS = LRUCache(4096)
+
+
+def get_day_offset(tz, date):
+    """
+    Return the DAY_OFFSET shared by all the times around the given date.
+
+    The offset covers the UTC times from the day before the date up to two
+    days after it, which holds all the zmanim of the date. When a timezone
+    transition happens within that window both fields are None, and times
+    must be converted through the timezone itself.
+    """
+    return _DAY_OFFSETS.get((tz, date), _compute_day_offset)
+
+
+def _compute_day_offset(key):
+    """Compute the DAY_OFFSET of a (tzinfo, date) key."""
+    tz, date = key
+    basetime = datetime.datetime.combine(date, datetime.time()).replace(
+        tzinfo=pytz.utc
+    )
+    first = (basetime - datetime.timedelta(days=1)).astimezone(tz)
+    last = (basetime + datetime.timedelta(days=2)).astimezone(tz)
+    if (first.utcoffset(), first.dst(), first.tzname()) != (
+        last.utcoffset(),
+        last.dst(),
+        last.tzname(),
+    ):
+        return DAY_OFFSET(None, None)
+    return DAY_OFFSET(first.utcoffset(), first.tzinfo)
+
+
+def offset_cache_info():
+    """Return the statistics of the timezone offsets cache."""
+    return _DAY_OFFSETS.info()
+
+
+def clear_offset_cache():
+    """Empty the timezone offsets cache."""
+    _DAY_OFFSETS.clear()
+
+
+def utc_to_local(value, tz, date=None):
+    """
+    Convert an aware datetime to the timezone tz.
+
+    The offset is looked up for the given date, by default the UTC date of
+    the value, and must cover the value.
+    """
+    if date is None:
+        date = value.astimezone(pytz.utc).date()
+    offset = get_day_offset(tz, date)
+    if offset.tzinfo is None:
+        return value.astimezone(tz)
+    return (value.replace(tzinfo=None) - value.utcoffset() + offset.utcoffset).replace(
+        tzinfo=offset.tzinfo
+    )
+
+
+def local_to_utc(value, tz):
+    """Convert a naive datetime in the timezone tz to an aware UTC datetime."""
+    offset = get_day_offset(tz, value.date())
+    if offset.tzinfo is None:
+        return localize(tz, value).astimezone(pytz.utc)
+    return (value - offset.utcoffset).replace(tzinfo=pytz.utc)
+
+
 class HebrewDate(BaseClass):  # pylint: disable=too-few-public-methods
     """Define a Hebrew date object."""
 
@@ -44,9 +238,17 @@ class HebrewDate(BaseClass):  # pylint: disable=too-few-public-methods
         self.day = day
 
 
+SOLAR_PROFILE = namedtuple(
+    "SOLAR_PROFILE",
+    "latitude, cos_latitude, tan_latitude, longitude_minutes, tzinfo",
+)
+
+
 class Location(BaseClass):
     """Define a geolocation for Zmanim calculations."""
 
+    _cached_attrs = ("_solar_profile",)
+
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -58,6 +260,7 @@ class Location(BaseClass):
         diaspora=False,
     ):
         """Initialitze the location object."""
+        self._solar_profile = None
         self._timezone = None
         self.name = name
         self.latitude = latitude
@@ -80,6 +283,28 @@ class Location(BaseClass):
             )
         )
 
+    @property
+    def latitude(self):
+        """Return the latitude."""
+        return self._latitude
+
+    @latitude.setter
+    def latitude(self, value):
+        """Set the latitude."""
+        self._latitude = value
+        self._solar_profile = None
+
+    @property
+    def longitude(self):
+        """Return the longitude."""
+        return self._longitude
+
+    @longitude.setter
+    def longitude(self, value):
+        """Set the longitude."""
+        self._longitude = value
+        self._solar_profile = None
+
     @property
     def timezone(self):
         """Return the timezone."""
@@ -88,6 +313,25 @@ class Location(BaseClass):
     @timezone.setter
     def timezone(self, value):
         """Set the timezone."""
-        self._timezone = (
-            value if isinstance(value, datetime.tzinfo) else pytz.timezone(value)
-        )
+        self._timezone = get_timezone(value)
+        self._solar_profile = None
+
+    @property
+    def solar_profile(self):
+        """
+        Return the location dependent terms of the solar calculations.
+
+        The profile holds the latitude in radians with its cosine and tangent,
+        the longitude converted to minutes of time and the timezone.
+        """
+        if self._solar_profile is None:
+            # we use radians, ratio is 2pi/360
+            latitude = math.pi * self.latitude / 180.0
+            self._solar_profile = SOLAR_PROFILE(
+                latitude,
+                math.cos(latitude),
+                math.tan(latitude),
+                4.0 * self.longitude,
+                self.timezone,
+            )
+        return self._solar_profile
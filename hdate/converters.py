@@ -5,10 +5,19 @@
 from __future__ import division
 
 import datetime
+import threading
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
 
-from hdate.common import HebrewDate
+from hdate.common import HebrewDate, LRUCache
 from hdate.htables import Months
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 
 def get_chalakim(hours, parts):
     """Return the number of total parts (chalakim)."""
@@ -77,9 +86,105 @@ def _days_from_3744(hebrew_year):
     return days
 
 
+YEAR_INFO = namedtuple("YEAR_INFO", "days_from_3744, size, jdn_tishrei1")
+
+
+def _compute_year_info(hebrew_year):
+    """Return the YEAR_INFO of the given year."""
+    days = _days_from_3744(hebrew_year)
+    size = _days_from_3744(hebrew_year + 1) - days
+    # Tishrei 1 is the first day after the computed number of days.
+    return YEAR_INFO(days, size, days + 1 + 1715118)
+
+
+_YEAR_CACHE = LRUCache(1024)
+
+
+def get_year_info(hebrew_year):
+    """Return: days since 3,1,3744, size and Tishrei 1 JDN of a hebrew year."""
+    return _YEAR_CACHE.get(hebrew_year, _compute_year_info)
+
+
+def year_cache_info():
+    """Return the hits, misses, maxsize and current size of the year cache."""
+    return _YEAR_CACHE.info()
+
+
+def set_year_cache_size(maxsize):
+    """Set the maximal number of years kept in the cache (0 disables it)."""
+    if maxsize < 0:
+        raise ValueError("maxsize ({}) must be non-negative".format(maxsize))
+    _YEAR_CACHE.resize(maxsize)
+
+
+def clear_year_cache():
+    """Remove all cached years and reset the cache statistics."""
+    _YEAR_CACHE.clear()
+
+
+class _TishreiTable(object):
+    """Lazily built, sorted array of Tishrei 1 JDNs for a range of years."""
+
+    def __init__(self, first_year, last_year):
+        """Initialize the table for years first_year..last_year (inclusive)."""
+        if first_year > last_year:
+            raise ValueError(
+                "first_year ({}) is after last_year ({})".format(first_year, last_year)
+            )
+        self.first_year = first_year
+        self.last_year = last_year
+        self._lock = threading.Lock()
+        self._jdns = None
+
+    def _build(self):
+        """Compute the Tishrei 1 JDN of every year, and of the year after."""
+        return array(
+            "l",
+            (
+                _days_from_3744(year) + 1 + 1715118
+                for year in range(self.first_year, self.last_year + 2)
+            ),
+        )
+
+    @property
+    def jdns(self):
+        """Return the table, building it on first use."""
+        if self._jdns is None:
+            with self._lock:
+                if self._jdns is None:
+                    self._jdns = self._build()
+        return self._jdns
+
+    def year_of(self, jdn):
+        """Return the hebrew year containing jdn, or None if out of range."""
+        jdns = self.jdns
+        if not jdns[0] <= jdn < jdns[-1]:
+            return None
+        return self.first_year + bisect_right(jdns, jdn) - 1
+
+
+TISHREI_TABLE_YEARS = (3761, 9999)
+_TISHREI_TABLE = _TishreiTable(*TISHREI_TABLE_YEARS)
+
+
+def set_tishrei_table_range(first_year, last_year):
+    """
+    Set the range of years covered by the Tishrei 1 lookup table.
+
+    The table is built lazily on the next conversion. Passing None for both
+    years disables the table, and all conversions fall back to computing the
+    year from the Gregorian calendar.
+    """
+    global _TISHREI_TABLE  # pylint: disable=global-statement
+    if first_year is None and last_year is None:
+        _TISHREI_TABLE = None
+    else:
+        _TISHREI_TABLE = _TishreiTable(first_year, last_year)
+
+
 def get_size_of_hebrew_year(hebrew_year):
     """Return: total days in hebrew year."""
-    return _days_from_3744(hebrew_year + 1) - _days_from_3744(hebrew_year)
+    return get_year_info(hebrew_year).size
 
 
 def gdate_to_jdn(date):
@@ -118,11 +223,13 @@ def hdate_to_jdn(date):
         month = 6
         day += 30
 
+    year_info = get_year_info(date.year)
+
     # Calculate days since 1,1,3744
-    day = _days_from_3744(date.year) + (59 * (month - 1) + 1) // 2 + day
+    day = year_info.days_from_3744 + (59 * (month - 1) + 1) // 2 + day
 
     # length of year
-    length_of_year = get_size_of_hebrew_year(date.year)
+    length_of_year = year_info.size
     # Special cases for this year
     if length_of_year % 10 > 4 and month > 2:  # long Heshvan
         day += 1
@@ -162,24 +269,31 @@ def jdn_to_gdate(jdn):
     return datetime.date(year, month, day)
 
 
-def jdn_to_hdate(jdn):
-    """Convert from the Julian day to the Hebrew day."""
-    # calculate Gregorian date
-    date = jdn_to_gdate(jdn)
+def get_hebrew_year(jdn):
+    """Return: the Hebrew year in which the Julian day falls."""
+    table = _TISHREI_TABLE
+    year = table.year_of(jdn) if table is not None else None
+
+    if year is None:
+        # calculate Gregorian date
+        date = jdn_to_gdate(jdn)
+
+        # Guess Hebrew year is Gregorian year + 3760
+        year = date.year + 3760
 
-    # Guess Hebrew year is Gregorian year + 3760
-    year = date.year + 3760
+        # Check if computed year was underestimated
+        if get_year_info(year + 1).jdn_tishrei1 <= jdn:
+            year = year + 1
 
-    jdn_tishrey1 = hdate_to_jdn(HebrewDate(year, Months.Tishrei, 1))
-    jdn_tishrey1_next_year = hdate_to_jdn(HebrewDate(year + 1, Months.Tishrei, 1))
+    return year
 
-    # Check if computed year was underestimated
-    if jdn_tishrey1_next_year <= jdn:
-        year = year + 1
-        jdn_tishrey1 = jdn_tishrey1_next_year
-        jdn_tishrey1_next_year = hdate_to_jdn(HebrewDate(year + 1, Months.Tishrei, 1))
 
-    size_of_year = get_size_of_hebrew_year(year)
+def jdn_to_hdate(jdn):
+    """Convert from the Julian day to the Hebrew day."""
+    year = get_hebrew_year(jdn)
+    year_info = get_year_info(year)
+    jdn_tishrey1 = year_info.jdn_tishrei1
+    size_of_year = year_info.size
 
     # days into this year, first month 0..29
     days = jdn - jdn_tishrey1
@@ -213,3 +327,269 @@ def jdn_to_hdate(jdn):
         month = month + 1
 
     return HebrewDate(year, Months(month), day)
+
+
+# Batch conversions
+#
+# The functions below mirror the scalar algorithms above using NumPy array
+# arithmetic. When NumPy is not installed, they fall back to looping over the
+# scalar functions and return lists instead of arrays.
+
+
+def _days_from_3744_array(hebrew_years):
+    """Return: Number of days since 3,1,3744 for an array of years."""
+    years_from_3744 = hebrew_years - 3744
+    molad_3744 = get_chalakim(1 + 6, 779)
+
+    leap_months = (years_from_3744 * 7 + 1) // 19
+    leap_left = (years_from_3744 * 7 + 1) % 19
+    months = years_from_3744 * 12 + leap_months
+
+    parts = months * PARTS_IN_MONTH + molad_3744
+    days = months * 28 + parts // PARTS_IN_DAY - 2
+
+    parts_left_in_week = parts % PARTS_IN_WEEK
+    parts_left_in_day = parts % PARTS_IN_DAY
+    week_day = parts_left_in_week // PARTS_IN_DAY
+
+    postpone = (
+        (leap_left < 12)
+        & (week_day == 3)
+        & (parts_left_in_day >= get_chalakim(9 + 6, 204))
+    ) | (
+        (leap_left < 7)
+        & (week_day == 2)
+        & (parts_left_in_day >= get_chalakim(15 + 6, 589))
+    )
+    days = days + postpone
+    week_day = week_day + postpone
+
+    # ADU
+    return days + np.isin(week_day, (1, 4, 6))
+
+
+def _gdate_to_jdn_array(years, months, days):
+    """Return: The julian day numbers of arrays of Gregorian dates."""
+    not_jan_or_feb = (14 - months) // 12
+    year_since_4800bc = years + 4800 - not_jan_or_feb
+    month_since_4800bc = months + 12 * not_jan_or_feb - 3
+    return (
+        days
+        + (153 * month_since_4800bc + 2) // 5
+        + 365 * year_since_4800bc
+        + (year_since_4800bc // 4 - year_since_4800bc // 100 + year_since_4800bc // 400)
+        - 32045
+    )
+
+
+def _jdn_to_gdate_array(jdns):
+    """Return: The Gregorian years, months and days of an array of jdns."""
+    # pylint: disable=invalid-name
+    l = jdns + 68569  # noqa: E741
+    n = (4 * l) // 146097
+    l = l - (146097 * n + 3) // 4  # noqa: E741
+    i = (4000 * (l + 1)) // 1461001
+    l = l - (1461 * i) // 4 + 31  # noqa: E741
+    j = (80 * l) // 2447
+    day = l - (2447 * j) // 80
+    l = j // 11  # noqa: E741
+    month = j + 2 - (12 * l)
+    year = 100 * (n - 49) + i + l
+    return year, month, day
+
+
+def _months_array(months):
+    """Return an integer array of month numbers, accepting Months members."""
+    months = np.asarray(months)
+    if months.dtype == object:
+        months = np.array(
+            [month.value if isinstance(month, Months) else month for month in months]
+        )
+    return months.astype(np.int64)
+
+
+def batch_jdn_to_hdate(jdns):
+    """
+    Convert a sequence of julian day numbers to Hebrew dates.
+
+    Return: years, months (Months values) and days, as NumPy arrays if NumPy
+            is installed, otherwise as lists.
+    """
+    if np is None:
+        return _batch_jdn_to_hdate_fallback(jdns)
+
+    jdns = np.asarray(jdns, dtype=np.int64)
+
+    # Guess Hebrew year is Gregorian year + 3760, fix underestimated years
+    year = _jdn_to_gdate_array(jdns)[0] + 3760
+    year = year + (_days_from_3744_array(year + 1) + 1 + 1715118 <= jdns)
+
+    days_from_3744 = _days_from_3744_array(year)
+    size_of_year = _days_from_3744_array(year + 1) - days_from_3744
+
+    # days into this year, first month 0..29
+    days = jdns - (days_from_3744 + 1 + 1715118)
+
+    # last 8 months always have 236 days
+    in_last_months = days >= (size_of_year - 236)
+    last_days = days - (size_of_year - 236)
+    last_month = last_days * 2 // 59
+    last_day = last_days - (last_month * 59 + 1) // 2 + 1
+    last_month = last_month + 4 + 1
+    last_month = np.where(
+        (size_of_year > 355) & (last_month <= 6), last_month + 8, last_month
+    )
+
+    # in 4-5 first months, keep the order of the special cases for this year
+    long_heshvan = size_of_year % 10 > 4
+    short_kislev = size_of_year % 10 < 4
+    long_month = (days - 1) * 2 // 59
+    short_month = (days + 1) * 2 // 59
+    regular_month = days * 2 // 59
+    conditions = [
+        long_heshvan & (days == 59),
+        long_heshvan & (days > 59),
+        short_kislev & (days > 87),
+    ]
+    first_month = np.select(conditions, [1, long_month, short_month], regular_month)
+    first_day = np.select(
+        conditions,
+        [
+            30,
+            days - (long_month * 59 + 1) // 2,
+            days - (short_month * 59 + 1) // 2 + 2,
+        ],
+        days - (regular_month * 59 + 1) // 2 + 1,
+    )
+    first_month = first_month + 1
+
+    return (
+        year,
+        np.where(in_last_months, last_month, first_month),
+        np.where(in_last_months, last_day, first_day),
+    )
+
+
+def _batch_jdn_to_hdate_fallback(jdns):
+    """Convert julian day numbers one by one, returning lists."""
+    dates = [jdn_to_hdate(int(jdn)) for jdn in jdns]
+    return (
+        [date.year for date in dates],
+        [date.month.value for date in dates],
+        [date.day for date in dates],
+    )
+
+
+def batch_gdate_to_hdate(years, months, days):
+    """
+    Convert sequences of Gregorian years, months and days to Hebrew dates.
+
+    Return: years, months (Months values) and days, as NumPy arrays if NumPy
+            is installed, otherwise as lists.
+    """
+    if np is None:
+        jdns = [
+            gdate_to_jdn(datetime.date(year, month, day))
+            for year, month, day in zip(years, months, days)
+        ]
+    else:
+        jdns = _gdate_to_jdn_array(
+            np.asarray(years, dtype=np.int64),
+            np.asarray(months, dtype=np.int64),
+            np.asarray(days, dtype=np.int64),
+        )
+    return batch_jdn_to_hdate(jdns)
+
+
+# Julian day number of the NumPy datetime64 epoch, 1970-01-01
+JDN_OF_EPOCH = 2440588
+
+
+def batch_datetime64_to_hdate(dates):
+    """
+    Convert an array of datetime64 values to Hebrew dates.
+
+    Without NumPy, any sequence of datetime.date objects is accepted.
+    Return: years, months (Months values) and days.
+    """
+    if np is None:
+        return batch_jdn_to_hdate([gdate_to_jdn(date) for date in dates])
+    jdns = np.asarray(dates, dtype="datetime64[D]").astype(np.int64) + JDN_OF_EPOCH
+    return batch_jdn_to_hdate(jdns)
+
+
+def batch_hdate_to_jdn(years, months, days):
+    """
+    Compute julian day numbers from sequences of Hebrew years, months and days.
+
+    Months may be given as Months members or as their integer values.
+    Return: julian day numbers, as a NumPy array if NumPy is installed,
+            otherwise as a list.
+    """
+    if np is None:
+        return [
+            hdate_to_jdn(HebrewDate(year, month, day))
+            for year, month, day in zip(years, months, days)
+        ]
+
+    years = np.asarray(years, dtype=np.int64)
+    months = _months_array(months)
+    days = np.asarray(days, dtype=np.int64)
+
+    is_adar_ii = months == Months.Adar_II.value
+    days = days + 30 * is_adar_ii
+    months = np.where(is_adar_ii | (months == Months.Adar_I.value), 6, months)
+
+    days_from_3744 = _days_from_3744_array(years)
+    length_of_year = _days_from_3744_array(years + 1) - days_from_3744
+
+    # Calculate days since 1,1,3744
+    days = days_from_3744 + (59 * (months - 1) + 1) // 2 + days
+
+    # Special cases for this year
+    days = days + ((length_of_year % 10 > 4) & (months > 2))  # long Heshvan
+    days = days - ((length_of_year % 10 < 4) & (months > 3))  # short Kislev
+    days = days + 30 * ((length_of_year > 365) & (months > 6))  # leap year
+
+    # adjust to julian
+    return days + 1715118
+
+
+def batch_jdn_to_gdate(jdns):
+    """
+    Convert a sequence of julian day numbers to Gregorian dates.
+
+    Return: years, months and days, as NumPy arrays if NumPy is installed,
+            otherwise as lists.
+    """
+    if np is None:
+        dates = [jdn_to_gdate(jdn) for jdn in jdns]
+        return (
+            [date.year for date in dates],
+            [date.month for date in dates],
+            [date.day for date in dates],
+        )
+    return _jdn_to_gdate_array(np.asarray(jdns, dtype=np.int64))
+
+
+def batch_jdn_to_datetime64(jdns):
+    """
+    Convert a sequence of julian day numbers to Gregorian dates.
+
+    Return: a datetime64[D] array if NumPy is installed, otherwise a list of
+            datetime.date objects.
+    """
+    if np is None:
+        return [jdn_to_gdate(jdn) for jdn in jdns]
+    jdns = np.asarray(jdns, dtype=np.int64)
+    return (jdns - JDN_OF_EPOCH).astype("datetime64[D]")
+
+
+def batch_hdate_to_datetime64(years, months, days):
+    """
+    Convert sequences of Hebrew years, months and days to Gregorian dates.
+
+    Return: a datetime64[D] array if NumPy is installed, otherwise a list of
+            datetime.date objects.
+    """
+    return batch_jdn_to_datetime64(batch_hdate_to_jdn(years, months, days))
@@ -14,12 +14,153 @@ from itertools import chain, product
 
 from hdate import converters as conv
 from hdate import htables
-from hdate.common import BaseClass, HebrewDate
+from hdate.common import BaseClass, HebrewDate, LRUCache
 from hdate.htables import HolidayTypes, Months
 
 _LOGGER = logging.getLogger(__name__)
 # pylint: disable=too-many-public-methods
 
+# Holidays of a (hebrew year, diaspora) pair, keyed by (month, day)
+_HOLIDAY_INDEX = LRUCache(256)
+
+# Interned HebrewYear instances, keyed by year
+_HEBREW_YEARS = LRUCache(1024)
+
+# Flattened readings of each year type, indexed by weeks since Rosh Hashana
+_READINGS = {}
+
+
+class HebrewYear(BaseClass):
+    """
+    Hebrew year class.
+
+    Holds the facts derived from the length and starting day of a Hebrew year.
+    Instances are shared, so all the dates of a year reuse the same
+    computations.
+    """
+
+    _cached_attrs = ("_year_info", "_pesach_jdn")
+    _year_info = None
+    _pesach_jdn = None
+
+    def __new__(cls, year):
+        """Return the shared instance of the given year."""
+        return _HEBREW_YEARS.get(year, lambda _: super(HebrewYear, cls).__new__(cls))
+
+    def __init__(self, year):
+        """Initialize the HebrewYear object."""
+        self.year = year
+
+    def __unicode__(self):
+        """Return a Unicode representation of HebrewYear."""
+        return hebrew_number(self.year)
+
+    def __repr__(self):
+        """Return a representation of HebrewYear for programmatic use."""
+        return "HebrewYear({})".format(self.year)
+
+    @property
+    def _info(self):
+        """Return the cached size and Tishrei 1 JDN of the year."""
+        if self._year_info is None:
+            self._year_info = conv.get_year_info(self.year)
+        return self._year_info
+
+    @property
+    def size(self):
+        """Return the number of days in the year."""
+        return self._info.size
+
+    @property
+    def is_leap(self):
+        """Return whether the year has two Adar months."""
+        return self.size > 355
+
+    @property
+    def short_kislev(self):
+        """Return whether this year has a short Kislev or not."""
+        return self.size in [353, 383]
+
+    @property
+    def long_heshvan(self):
+        """Return whether this year has a long Marcheshvan or not."""
+        return self.size in [355, 385]
+
+    @property
+    def tishrei1_jdn(self):
+        """Return the Julian day number of Rosh Hashana."""
+        return self._info.jdn_tishrei1
+
+    @property
+    def pesach_jdn(self):
+        """Return the Julian day number of the first day of Pesach."""
+        if self._pesach_jdn is None:
+            self._pesach_jdn = conv.hdate_to_jdn(
+                HebrewDate(self.year, Months.Nisan, 15)
+            )
+        return self._pesach_jdn
+
+    @property
+    def rosh_hashana_dow(self):
+        """Return the Hebrew day of week for Rosh Hashana."""
+        return (self.tishrei1_jdn + 1) % 7 + 1
+
+    @property
+    def pesach_dow(self):
+        """Return the first day of week for Pesach."""
+        return (self.pesach_jdn + 1) % 7 + 1
+
+    def year_type(self, diaspora):
+        """Return the key of the year in the readings table."""
+        return (
+            diaspora * 1000
+            + self.rosh_hashana_dow * 100
+            + ((self.size % 10) - 3) * 10
+            + self.pesach_dow
+        )
+
+    def readings(self, diaspora):
+        """Return the parasha read on each week since Rosh Hashana."""
+        year_type = self.year_type(diaspora)
+        readings = _READINGS.get(year_type)
+        if readings is None:
+            readings = tuple(
+                chain(
+                    *(
+                        [x] if isinstance(x, int) else x
+                        for x in htables.READINGS[year_type]
+                    )
+                )
+            )
+            _READINGS[year_type] = readings
+        return readings
+
+    def reading(self, days, dow, diaspora):
+        """
+        Return the parasha of the week of a day of the year.
+
+        The day is given by the number of days since Rosh Hashana and its
+        Hebrew day of week. Returns None when the week's Shabbat falls in the
+        next year.
+        """
+        # Number of weeks since rosh hashana
+        weeks = (days + self.rosh_hashana_dow - 1) // 7
+        _LOGGER.debug("Since Rosh Hashana - Days: %d, Weeks %d", days, weeks)
+
+        # If it's currently Simchat Torah, return VeZot Haberacha.
+        if weeks == 3:
+            if days <= 22 and diaspora and dow != 7 or days <= 21 and not diaspora:
+                return 54
+
+        # Special case for Simchat Torah in diaspora.
+        if weeks == 4 and days == 22 and diaspora:
+            return 54
+
+        readings = self.readings(diaspora)
+        if weeks >= len(readings):
+            return None
+        return readings[weeks]
+
 
 class HDate(BaseClass):
     """
@@ -28,6 +169,8 @@ class HDate(BaseClass):
     Supports converting from Gregorian and Julian to Hebrew date.
     """
 
+    _cached_attrs = ("_jdn_cache", "_hdate_cache", "_gdate_cache")
+
     def __init__(
         self, gdate=datetime.date.today(), diaspora=False, hebrew=True, heb_date=None
     ):
@@ -36,6 +179,7 @@ class HDate(BaseClass):
         self._hdate = None
         self._gdate = None
         self._last_updated = None
+        self._reset_cache()
 
         # Assign values
         # Keep hdate after gdate assignment so as not to cause recursion error
@@ -90,20 +234,31 @@ class HDate(BaseClass):
         """Implement the greater than or equal operator."""
         return not self < other
 
+    def _reset_cache(self):
+        """Forget the memoized Julian day and the derived representation."""
+        self._jdn_cache = None
+        self._hdate_cache = None
+        self._gdate_cache = None
+
     @property
     def hdate(self):
         """Return the hebrew date."""
         if self._last_updated == "hdate":
             return self._hdate
-        return conv.jdn_to_hdate(self._jdn)
+        if self._hdate_cache is None:
+            self._hdate_cache = conv.jdn_to_hdate(self._jdn)
+        return self._hdate_cache
 
     @hdate.setter
     def hdate(self, date):
         """Set the dates of the HDate object based on a given Hebrew date."""
+        gdate = jdn = None
         # Sanity checks
         if date is None and isinstance(self.gdate, datetime.date):
-            # Calculate the value since gdate has been set
+            # Calculate the value since gdate has been set, the Gregorian date
+            # and Julian day remain valid for the computed Hebrew date.
             date = self.hdate
+            gdate, jdn = self.gdate, self._jdn
 
         if not isinstance(date, HebrewDate):
             raise TypeError("date: {} is not of type HebrewDate".format(date))
@@ -112,26 +267,35 @@ class HDate(BaseClass):
 
         self._last_updated = "hdate"
         self._hdate = date
+        self._reset_cache()
+        self._gdate_cache = gdate
+        self._jdn_cache = jdn
 
     @property
     def gdate(self):
         """Return the Gregorian date for the given Hebrew date object."""
         if self._last_updated == "gdate":
             return self._gdate
-        return conv.jdn_to_gdate(self._jdn)
+        if self._gdate_cache is None:
+            self._gdate_cache = conv.jdn_to_gdate(self._jdn)
+        return self._gdate_cache
 
     @gdate.setter
     def gdate(self, date):
         """Set the Gregorian date for the given Hebrew date object."""
         self._last_updated = "gdate"
         self._gdate = date
+        self._reset_cache()
 
     @property
     def _jdn(self):
         """Return the Julian date number for the given date."""
-        if self._last_updated == "gdate":
-            return conv.gdate_to_jdn(self.gdate)
-        return conv.hdate_to_jdn(self.hdate)
+        if self._jdn_cache is None:
+            if self._last_updated == "gdate":
+                self._jdn_cache = conv.gdate_to_jdn(self.gdate)
+            else:
+                self._jdn_cache = conv.hdate_to_jdn(self.hdate)
+        return self._jdn_cache
 
     @property
     def hebrew_date(self):
@@ -191,20 +355,20 @@ class HDate(BaseClass):
 
     def _holiday_entry(self):
         """Return the abstract holiday information from holidays table."""
-        holidays_list = self.get_holidays_for_year()
-        holidays_list = [
-            holiday
-            for holiday, holiday_hdate in holidays_list
-            if holiday_hdate.hdate == self.hdate
-        ]
-        assert len(holidays_list) <= 1
+        index = _HOLIDAY_INDEX.get(
+            (self.hdate.year, self.diaspora), _build_holiday_index
+        )
+        # If anything matches return it, otherwise return the "NULL" holiday
+        return index.get((self.hdate.month, self.hdate.day), htables.HOLIDAYS[0])
 
-        # If anything is left return it, otherwise return the "NULL" holiday
-        return holidays_list[0] if holidays_list else htables.HOLIDAYS[0]
+    @property
+    def hebrew_year(self):
+        """Return the HebrewYear object of this date."""
+        return HebrewYear(self.hdate.year)
 
     def short_kislev(self):
         """Return whether this year has a short Kislev or not."""
-        return self.year_size() in [353, 383]
+        return self.hebrew_year.short_kislev
 
     @property
     def dow(self):
@@ -214,23 +378,21 @@ class HDate(BaseClass):
 
     def year_size(self):
         """Return the size of the given Hebrew year."""
-        return conv.get_size_of_hebrew_year(self.hdate.year)
+        return self.hebrew_year.size
 
     def rosh_hashana_dow(self):
         """Return the Hebrew day of week for Rosh Hashana."""
-        jdn = conv.hdate_to_jdn(HebrewDate(self.hdate.year, Months.Tishrei, 1))
-        return (jdn + 1) % 7 + 1
+        return self.hebrew_year.rosh_hashana_dow
 
     def pesach_dow(self):
         """Return the first day of week for Pesach."""
-        jdn = conv.hdate_to_jdn(HebrewDate(self.hdate.year, Months.Nisan, 15))
-        return (jdn + 1) % 7 + 1
+        return self.hebrew_year.pesach_dow
 
     @property
     def omer_day(self):
         """Return the day of the Omer."""
-        first_omer_day = HebrewDate(self.hdate.year, Months.Nisan, 16)
-        omer_day = self._jdn - conv.hdate_to_jdn(first_omer_day) + 1
+        # The first day of the Omer is the day after Pesach
+        omer_day = self._jdn - self.hebrew_year.pesach_jdn
         if not 0 < omer_day < 50:
             return 0
         return omer_day
@@ -418,53 +580,54 @@ class HDate(BaseClass):
 
     def get_reading(self):
         """Return number of hebrew parasha."""
-        _year_type = (self.year_size() % 10) - 3
-        year_type = (
-            self.diaspora * 1000
-            + self.rosh_hashana_dow() * 100
-            + _year_type * 10
-            + self.pesach_dow()
-        )
-
-        _LOGGER.debug("Year type: %d", year_type)
+        hebrew_year = self.hebrew_year
+        _LOGGER.debug("Year type: %d", hebrew_year.year_type(self.diaspora))
 
         # Number of days since rosh hashana
-        rosh_hashana = HebrewDate(self.hdate.year, Months.Tishrei, 1)
-        days = self._jdn - conv.hdate_to_jdn(rosh_hashana)
-        # Number of weeks since rosh hashana
-        weeks = (days + self.rosh_hashana_dow() - 1) // 7
-        _LOGGER.debug("Since Rosh Hashana - Days: %d, Weeks %d", days, weeks)
-
-        # If it's currently Simchat Torah, return VeZot Haberacha.
-        if weeks == 3:
-            if (
-                days <= 22
-                and self.diaspora
-                and self.dow != 7
-                or days <= 21
-                and not self.diaspora
-            ):
-                return 54
-
-        # Special case for Simchat Torah in diaspora.
-        if weeks == 4 and days == 22 and self.diaspora:
-            return 54
-
-        # Return the indexes for the readings of the given year
-        def unpack_readings(readings):
-            return list(chain(*([x] if isinstance(x, int) else x for x in readings)))
+        days = self._jdn - hebrew_year.tishrei1_jdn
+        reading = hebrew_year.reading(days, self.dow, self.diaspora)
 
-        reading_for_year = htables.READINGS[year_type]
-        readings = unpack_readings(reading_for_year)
         # Maybe recompute the year type based on the upcoming shabbat.
         # This avoids an edge case where today is before Rosh Hashana but
         # Shabbat is in a new year afterwards.
-        if (
-            weeks >= len(readings)
-            and self.hdate.year < self.upcoming_shabbat.hdate.year
-        ):
+        if reading is None and self.hdate.year < self.upcoming_shabbat.hdate.year:
             return self.upcoming_shabbat.get_reading()
-        return readings[weeks]
+        return reading
+
+    def parashot_for_year(self):
+        """Return the (Shabbat date, parasha) pairs of the HDate's year."""
+        hebrew_year = self.hebrew_year
+        first_shabbat = 7 - hebrew_year.rosh_hashana_dow
+        return [
+            (
+                conv.jdn_to_gdate(hebrew_year.tishrei1_jdn + days),
+                hebrew_year.reading(days, 7, self.diaspora),
+            )
+            for days in range(first_shabbat, hebrew_year.size, 7)
+        ]
+
+
+def _build_holiday_index(key):
+    """Map every (month, day) of a (year, diaspora) pair to its holiday."""
+    year, diaspora = key
+    index = {}
+    for holiday in htables.HOLIDAYS:
+        if holiday.israel_diaspora not in ("", "DIASPORA" if diaspora else "ISRAEL"):
+            continue
+        if len(holiday.date) < 2:
+            continue
+        days, months = (
+            [x] if isinstance(x, (int, Months)) else x for x in holiday.date
+        )
+        for month, day in product(months, days):
+            # The special cases are decided by the day the holiday falls on.
+            candidate = HDate(
+                heb_date=HebrewDate(year, month, day), diaspora=diaspora
+            )
+            if all(func(candidate) for func in holiday.date_functions_list):
+                assert (candidate.hdate.month, day) not in index
+                index[(candidate.hdate.month, day)] = holiday
+    return index
 
 
 def hebrew_number(num, hebrew=True, short=False):
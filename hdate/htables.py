@@ -346,9 +346,12 @@ def year_is_after(year):
     Return a lambda function.
 
     Lambda checks that a given HDate object's hebrew year is after the
-    requested year.
+    requested year. The first year for which the result changes is kept as
+    the lambda's year_limit attribute.
     """
-    return lambda x: x.hdate.year > year
+    func = lambda x: x.hdate.year > year  # noqa: E731
+    func.year_limit = year + 1
+    return func
 
 
 def year_is_before(year):
@@ -356,9 +359,12 @@ def year_is_before(year):
     Return a lambda function.
 
     Lambda checks that a given HDate object's hebrew year is before the
-    requested year.
+    requested year. The first year for which the result changes is kept as
+    the lambda's year_limit attribute.
     """
-    return lambda x: x.hdate.year < year
+    func = lambda x: x.hdate.year < year  # noqa: E731
+    func.year_limit = year
+    return func
 
 
 def move_if_not_on_dow(original, replacement, dow_not_orig, dow_replacement):
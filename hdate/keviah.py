@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+Calendar templates for the types (keviot) of Hebrew years.
+
+A Hebrew year is fully determined by the day of week of Rosh Hashana and by its
+length, which leaves 14 possible keviot. All the years sharing a keviah have
+their holidays, readings and Omer count on the same days, so the calendar of a
+year is the template of its keviah shifted by the Julian day of Rosh Hashana.
+"""
+from __future__ import division
+
+import datetime
+from bisect import bisect_right
+from collections import namedtuple
+
+from hdate import converters as conv
+from hdate import htables
+from hdate.common import HebrewDate, LRUCache
+from hdate.date import HDate, HebrewYear
+
+DAY = namedtuple("DAY", "month, day, dow, holiday, parasha, omer_day")
+RANGE_DAY = namedtuple("RANGE_DAY", "gdate, hdate, jdn, dow, holiday, omer_day")
+
+# Years from which one of the holidays' year filters changes its result.
+# The years between two limits evaluate all the year filters the same way.
+YEAR_LIMITS = sorted(
+    set(
+        func.year_limit
+        for holiday in htables.HOLIDAYS
+        for func in holiday.date_functions_list
+        if hasattr(func, "year_limit")
+    )
+)
+
+_TEMPLATES = LRUCache(512)
+
+
+def keviah(year):
+    """Return the (Rosh Hashana day of week, length) of a Hebrew year."""
+    hebrew_year = HebrewYear(year)
+    return hebrew_year.rosh_hashana_dow, hebrew_year.size
+
+
+def get_template(year, diaspora=False):
+    """
+    Return the calendar template shared by the given year.
+
+    The template is a tuple of DAY entries indexed by the number of days since
+    Rosh Hashana. The parasha of the days leading to a Shabbat in the next
+    year depends on the next year's keviah, and is left as None.
+    """
+    key = keviah(year) + (diaspora, bisect_right(YEAR_LIMITS, year))
+    return _TEMPLATES.get(key, lambda _: _build_template(year, diaspora))
+
+
+def _build_template(year, diaspora):
+    """Compute the calendar template of the given year."""
+    # pylint: disable=protected-access
+    hebrew_year = HebrewYear(year)
+    days = []
+    for offset in range(hebrew_year.size):
+        date = HDate(
+            conv.jdn_to_gdate(hebrew_year.tishrei1_jdn + offset), diaspora=diaspora
+        )
+        if offset + 7 - date.dow >= hebrew_year.size:
+            parasha = None
+        else:
+            parasha = date.get_reading()
+        days.append(
+            DAY(
+                date.hdate.month,
+                date.hdate.day,
+                date.dow,
+                date._holiday_entry(),
+                parasha,
+                date.omer_day,
+            )
+        )
+    return tuple(days)
+
+
+def get_day(date, diaspora=False):
+    """Return the DAY entry of the given Gregorian date."""
+    jdn = conv.gdate_to_jdn(date)
+    year = conv.get_hebrew_year(jdn)
+    day = get_template(year, diaspora)[jdn - HebrewYear(year).tishrei1_jdn]
+    if day.parasha is None:
+        day = day._replace(parasha=HDate(date, diaspora=diaspora).get_reading())
+    return day
+
+
+def iter_range(start, end, diaspora=False):
+    """
+    Iterate over the days from start up to, but not including, end.
+
+    Yields a RANGE_DAY for each Gregorian date of the range. The days are
+    read from the template of each year in turn, so walking the range costs a
+    constant time and memory per day.
+    """
+    one_day = datetime.timedelta(days=1)
+    gdate = start
+    jdn = conv.gdate_to_jdn(start)
+    last_jdn = conv.gdate_to_jdn(end)
+    year = conv.get_hebrew_year(jdn)
+
+    while jdn < last_jdn:
+        hebrew_year = HebrewYear(year)
+        template = get_template(year, diaspora)
+        offset = jdn - hebrew_year.tishrei1_jdn
+        year_end = min(last_jdn, hebrew_year.tishrei1_jdn + hebrew_year.size)
+        while jdn < year_end:
+            day = template[offset]
+            yield RANGE_DAY(
+                gdate,
+                HebrewDate(year, day.month, day.day),
+                jdn,
+                day.dow,
+                day.holiday,
+                day.omer_day,
+            )
+            gdate += one_day
+            jdn += 1
+            offset += 1
+        year += 1
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+"""
+JSON HTTP service for the Hebrew date and the zmanim.
+
+The service is a plain WSGI application, run locally with the standard
+library server by: python -m hdate.server [--host HOST] [--port PORT]
+
+Endpoints (all parameters are optional):
+    /hdate     date, diaspora, hebrew
+    /zmanim    date, latitude, longitude, timezone, diaspora,
+               candle_lighting_offset, havdalah_offset
+    /holidays  year (Hebrew) or date, diaspora, hebrew
+    /parasha   date, diaspora, hebrew
+    /stats     counters of the requests and of the caches
+
+Dates are given as YYYY-MM-DD and default to today, booleans as 0 or 1.
+Responses depend only on their path and parameters. They are cached, and
+carry an ETag and a Last-Modified header derived from the requested date.
+"""
+from __future__ import print_function
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import math
+from collections import Counter
+from email.utils import formatdate, parsedate_tz
+
+import pytz
+
+from hdate import converters as conv
+from hdate import htables
+from hdate.common import Location, LRUCache, offset_cache_info
+from hdate.date import HDate, HebrewYear
+from hdate.keviah import iter_range
+from hdate.zmanim import Zmanim
+
+try:
+    from urllib.parse import parse_qsl
+except ImportError:  # pragma: no cover
+    from urlparse import parse_qsl  # Python 2
+
+_LOGGER = logging.getLogger(__name__)
+
+# Dates whose neighbouring days and Hebrew year are all within the range of
+# the datetime module, and the Hebrew years lying completely between them.
+DATE_RANGE = (datetime.date(2, 1, 1), datetime.date(9998, 12, 31))
+YEAR_RANGE = (
+    conv.get_hebrew_year(conv.gdate_to_jdn(DATE_RANGE[0])) + 1,
+    conv.get_hebrew_year(conv.gdate_to_jdn(DATE_RANGE[1])) - 1,
+)
+
+STATUS = {
+    200: "200 OK",
+    304: "304 Not Modified",
+    400: "400 Bad Request",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+    500: "500 Internal Server Error",
+}
+
+
+class BadRequest(ValueError):
+    """Invalid request parameters."""
+
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD date within DATE_RANGE."""
+    try:
+        date = datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise BadRequest("Invalid date: {}".format(value))
+    if not DATE_RANGE[0] <= date <= DATE_RANGE[1]:
+        raise BadRequest("Date out of range: {}".format(value))
+    return date
+
+
+def _parse_bool(value):
+    """Parse a 0 or 1 flag."""
+    if value not in ("0", "1"):
+        raise BadRequest("Invalid flag: {}".format(value))
+    return value == "1"
+
+
+def _parse_number(kind, low=None, high=None):
+    """Return a parser of finite numbers of the given type, between low and high."""
+
+    def parse(value):
+        try:
+            number = kind(value)
+        except ValueError:
+            raise BadRequest("Invalid number: {}".format(value))
+        if math.isinf(number) or math.isnan(number):
+            raise BadRequest("Invalid number: {}".format(value))
+        if (low is not None and number < low) or (high is not None and number > high):
+            raise BadRequest("Number out of range: {}".format(value))
+        return number
+
+    return parse
+
+
+def _parse_timezone(value):
+    """Check a timezone name."""
+    if value not in pytz.all_timezones_set:
+        raise BadRequest("Unknown timezone: {}".format(value))
+    return value
+
+
+# Parameters of each endpoint, with their parser and default value.
+# The default of the date is the current date.
+_DATE = ("date", _parse_date, None)
+_DIASPORA = ("diaspora", _parse_bool, False)
+_HEBREW = ("hebrew", _parse_bool, False)
+PARAMETERS = {
+    "/hdate": (_DATE, _DIASPORA, _HEBREW),
+    "/zmanim": (
+        _DATE,
+        _DIASPORA,
+        ("latitude", _parse_number(float, -90, 90), 31.778),
+        ("longitude", _parse_number(float, -180, 180), 35.235),
+        ("timezone", _parse_timezone, "Asia/Jerusalem"),
+        ("candle_lighting_offset", _parse_number(int, 0, 120), 18),
+        ("havdalah_offset", _parse_number(int, 0, 120), 0),
+    ),
+    "/holidays": (
+        _DATE,
+        ("year", _parse_number(int, *YEAR_RANGE), None),
+        _DIASPORA,
+        _HEBREW,
+    ),
+    "/parasha": (_DATE, _DIASPORA, _HEBREW),
+}
+
+
+def _hebrew_date(hdate):
+    """Return the JSON representation of a HebrewDate."""
+    return {"year": hdate.year, "month": hdate.month.name, "day": hdate.day}
+
+
+def _description(description, hebrew):
+    """Return a holiday description in the requested language."""
+    return description.hebrew.long if hebrew else description.english
+
+
+def _isoformat(value):
+    """Return the ISO format of a datetime, or None."""
+    return value.isoformat() if value is not None else None
+
+
+def get_hdate(date, diaspora, hebrew):
+    """Return the Hebrew date of a Gregorian date."""
+    day = HDate(date, diaspora=diaspora, hebrew=hebrew)
+    return {
+        "date": date.isoformat(),
+        "hebrew_date": _hebrew_date(day.hdate),
+        "description": day.hebrew_date,
+        "day_of_week": day.dow,
+        "holiday": day.holiday_name or None,
+        "holiday_description": day.holiday_description or None,
+        "omer_day": day.omer_day,
+        "is_shabbat": day.is_shabbat,
+        "is_yom_tov": day.is_yom_tov,
+    }
+
+
+# pylint: disable=too-many-arguments
+def get_zmanim(
+    date,
+    diaspora,
+    latitude,
+    longitude,
+    timezone,
+    candle_lighting_offset,
+    havdalah_offset,
+):
+    """Return the zmanim of a location on a Gregorian date."""
+    location = Location(
+        latitude=latitude, longitude=longitude, timezone=timezone, diaspora=diaspora
+    )
+    zmanim = Zmanim(
+        date,
+        location,
+        candle_lighting_offset=candle_lighting_offset,
+        havdalah_offset=havdalah_offset,
+    )
+    times = zmanim.zmanim
+    times.pop("sun_hour")
+    return {
+        "date": date.isoformat(),
+        "zmanim": {key: _isoformat(value) for key, value in times.items()},
+        "sun_hour_minutes": zmanim.get_utc_sun_time_full()["sun_hour"],
+        "candle_lighting": _isoformat(zmanim.candle_lighting),
+        "havdalah": _isoformat(zmanim.havdalah),
+    }
+
+
+def get_holidays(date, year, diaspora, hebrew):
+    """Return the holidays of a Hebrew year, by default the one of date."""
+    if year is None:
+        year = conv.get_hebrew_year(conv.gdate_to_jdn(date))
+    hebrew_year = HebrewYear(year)
+    start = conv.jdn_to_gdate(hebrew_year.tishrei1_jdn)
+    end = conv.jdn_to_gdate(hebrew_year.tishrei1_jdn + hebrew_year.size)
+    return {
+        "year": year,
+        "holidays": [
+            {
+                "date": day.gdate.isoformat(),
+                "hebrew_date": _hebrew_date(day.hdate),
+                "name": day.holiday.name,
+                "type": day.holiday.type.name,
+                "description": _description(day.holiday.description, hebrew),
+            }
+            for day in iter_range(start, end, diaspora)
+            if day.holiday.name
+        ],
+    }
+
+
+def get_parasha(date, diaspora, hebrew):
+    """Return the parasha read on the Shabbat following a Gregorian date."""
+    shabbat = HDate(date, diaspora=diaspora, hebrew=hebrew).upcoming_shabbat
+    reading = shabbat.get_reading()
+    return {
+        "date": date.isoformat(),
+        "shabbat": shabbat.gdate.isoformat(),
+        "number": reading,
+        "parasha": htables.PARASHAOT[reading][hebrew],
+    }
+
+
+HANDLERS = {
+    "/hdate": get_hdate,
+    "/zmanim": get_zmanim,
+    "/holidays": get_holidays,
+    "/parasha": get_parasha,
+}
+
+
+class HDateApp(object):
+    """
+    WSGI application serving the endpoints as JSON.
+
+    The rendered responses are kept in an LRU cache of cache_size entries,
+    keyed by the path and the parsed parameters. today returns the date used
+    when none is requested.
+    """
+
+    def __init__(self, cache_size=1024, today=datetime.date.today):
+        """Initialize the application with an empty cache."""
+        self.cache = LRUCache(cache_size)
+        self.today = today
+        self.requests = Counter()
+
+    def __call__(self, environ, start_response):
+        """Handle a WSGI request."""
+        path = environ.get("PATH_INFO", "") or "/"
+        known = path in HANDLERS or path == "/stats"
+        self.requests[path if known else "other"] += 1
+        if environ.get("REQUEST_METHOD", "GET") not in ("GET", "HEAD"):
+            return self._respond(start_response, 405, {"error": "Use GET"})
+        if path == "/stats":
+            return self._respond(start_response, 200, self.stats())
+        if path not in HANDLERS:
+            return self._respond(start_response, 404, {"error": "Not found"})
+
+        try:
+            params = self.parse(path, environ.get("QUERY_STRING", ""))
+        except BadRequest as error:
+            return self._respond(start_response, 400, {"error": str(error)})
+
+        key = (path, tuple(sorted(params.items())))
+        try:
+            body, etag, last_modified = self.cache.get(key, self._render)
+        except (ValueError, OverflowError) as error:
+            return self._respond(start_response, 400, {"error": str(error)})
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error computing %s %r", path, params)
+            return self._respond(start_response, 500, {"error": "Internal error"})
+        headers = [
+            ("ETag", etag),
+            ("Last-Modified", last_modified),
+            ("Cache-Control", "public, max-age=86400"),
+        ]
+        if self._not_modified(environ, etag, params["date"]):
+            start_response(STATUS[304], headers)
+            return []
+        return self._respond(start_response, 200, body, headers)
+
+    def parse(self, path, query):
+        """Return the parameters of a request, with their defaults applied."""
+        values = dict(parse_qsl(query))
+        params = {}
+        for name, parse, default in PARAMETERS[path]:
+            params[name] = parse(values.pop(name)) if name in values else default
+        if values:
+            raise BadRequest("Unknown parameters: {}".format(", ".join(sorted(values))))
+        if params["date"] is None:
+            params["date"] = self.today()
+        return params
+
+    @staticmethod
+    def _render(key):
+        """Compute the body, ETag and Last-Modified header of a response."""
+        path, params = key
+        body = json.dumps(
+            HANDLERS[path](**dict(params)), ensure_ascii=False, sort_keys=True
+        ).encode("utf-8")
+        etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+        return body, etag, _http_date(dict(params)["date"])
+
+    @staticmethod
+    def _not_modified(environ, etag, date):
+        """Return whether the client holds the current response."""
+        if "HTTP_IF_NONE_MATCH" in environ:
+            tags = [tag.strip() for tag in environ["HTTP_IF_NONE_MATCH"].split(",")]
+            return etag in tags or "*" in tags
+        since = parsedate_tz(environ.get("HTTP_IF_MODIFIED_SINCE", ""))
+        if since is None:
+            return False
+        since = datetime.datetime(*since[:6])
+        return since >= datetime.datetime.combine(date, datetime.time())
+
+    @staticmethod
+    def _respond(start_response, code, body, headers=()):
+        """Send a JSON response."""
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        start_response(
+            STATUS[code],
+            [
+                ("Content-Type", "application/json; charset=utf-8"),
+                ("Content-Length", str(len(body))),
+            ]
+            + list(headers),
+        )
+        return [body]
+
+    def stats(self):
+        """Return the counters of the requests and of the caches."""
+        return {
+            "requests": dict(self.requests),
+            "response_cache": self.cache.info()._asdict(),
+            "year_cache": conv.year_cache_info()._asdict(),
+            "offset_cache": offset_cache_info()._asdict(),
+        }
+
+
+def _http_date(date):
+    """Return the HTTP date of the midnight (utc) starting a date."""
+    midnight = datetime.datetime.combine(date, datetime.time())
+    timestamp = (midnight - datetime.datetime(1970, 1, 1)).total_seconds()
+    return formatdate(timestamp, usegmt=True)
+
+
+application = HDateApp()  # pylint: disable=invalid-name
+
+
+def main(argv=None):
+    """Serve the application with the standard library WSGI server."""
+    from wsgiref.simple_server import make_server
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, application)
+    print("Serving on http://{}:{}".format(args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+"""
+Timelines of the times of a location.
+
+The melacha timeline is computed once for a location and a period. Every
+Shabbat and Yom Tov stretch becomes a single [candle lighting, havdalah)
+interval, so finding whether melacha is forbidden at a given time is a binary
+search.
+
+The transitions are the instants at which anything tracked for a location
+changes, so a client can sleep until the next one instead of polling.
+"""
+import datetime
+import heapq
+from bisect import bisect_right
+from collections import namedtuple
+
+import pytz
+
+from hdate.common import LRUCache
+from hdate.date import HDate
+from hdate.htables import HolidayTypes
+from hdate.keviah import iter_range
+from hdate.zmanim import DEFAULT_ZMANIM, Zmanim
+
+# Kinds of transitions, in the order of transitions happening at the same time.
+TRANSITION_KINDS = ("zman", "melacha_start", "melacha_end", "date", "omer")
+
+# The value of a transition is the name of the zman, the Hebrew date starting
+# at sunset, or the day of the Omer starting at sunset. It is None for the
+# start and end of issur melacha.
+TRANSITION = namedtuple("TRANSITION", "time, kind, value")
+
+# Sorted transitions of each day, keyed by date and location settings.
+_DAY_TRANSITIONS = LRUCache(1024)
+
+
+class MelachaTimeline(object):
+    """Sorted, disjoint intervals of time during which melacha is forbidden."""
+
+    def __init__(self, intervals):
+        """Initialize the timeline from sorted (start, end) datetime pairs."""
+        self.intervals = []
+        for start, end in intervals:
+            if self.intervals and start <= self.intervals[-1][1]:
+                previous_start, previous_end = self.intervals.pop()
+                start, end = previous_start, max(previous_end, end)
+            self.intervals.append((start, end))
+        self._starts = [start for start, _ in self.intervals]
+
+    def __len__(self):
+        """Return the number of intervals."""
+        return len(self.intervals)
+
+    def __iter__(self):
+        """Iterate over the (start, end) intervals."""
+        return iter(self.intervals)
+
+    def __contains__(self, moment):
+        """Return whether melacha is forbidden at the given moment."""
+        return self.interval_at(moment) is not None
+
+    def __repr__(self):
+        """Return a representation of the timeline."""
+        return "MelachaTimeline({!r})".format(self.intervals)
+
+    def interval_at(self, moment):
+        """Return the interval holding the given aware datetime, or None."""
+        index = bisect_right(self._starts, moment) - 1
+        if index >= 0 and moment < self.intervals[index][1]:
+            return self.intervals[index]
+        return None
+
+    def in_effect(self, moment):
+        """Return whether melacha is forbidden at the given aware datetime."""
+        return moment in self
+
+
+def _is_assur(day):
+    """Return whether the RANGE_DAY is a Shabbat or a Yom Tov."""
+    return day.gdate.weekday() == 5 or day.holiday.type == HolidayTypes.YOM_TOV
+
+
+def melacha_timeline(
+    location, start, end, candle_lighting_offset=18, havdalah_offset=0
+):
+    """
+    Return the MelachaTimeline of a location for the days from start to end.
+
+    The timeline holds every stretch of Shabbat and Yom Tov days having a day
+    from start up to, but not including, end. A stretch runs from
+    candle lighting on the eve of its first day to havdalah on its last day,
+    as given by Zmanim with the same offsets.
+    """
+    # A stretch lasts at most three days, extend the range to hold them fully.
+    margin = datetime.timedelta(days=3)
+    stretches = []
+    previous = None
+    for day in iter_range(start - margin, end + margin, location.diaspora):
+        if _is_assur(day):
+            if previous is not None and _is_assur(previous):
+                stretches[-1][1] = day.gdate
+            else:
+                stretches.append([day.gdate, day.gdate])
+        previous = day
+
+    intervals = []
+    for first, last in stretches:
+        if last < start or first >= end:
+            continue
+        eve = Zmanim(
+            first - datetime.timedelta(days=1),
+            location,
+            candle_lighting_offset=candle_lighting_offset,
+            havdalah_offset=havdalah_offset,
+        )
+        motzei = Zmanim(
+            last,
+            location,
+            candle_lighting_offset=candle_lighting_offset,
+            havdalah_offset=havdalah_offset,
+        )
+        intervals.append((eve.candle_lighting, motzei.havdalah))
+    return MelachaTimeline(intervals)
+
+
+def day_transitions(
+    location, date, candle_lighting_offset=18, havdalah_offset=0, registry=None
+):
+    """
+    Return the sorted tuple of TRANSITION of a Gregorian date.
+
+    The transitions of a date are its zmanim, except the registry durations,
+    the start or end of issur melacha on it, and at sunset the change of the
+    Hebrew date and of the Omer count. The times are aware datetimes in the
+    location's timezone. The tuples are cached per date and location settings.
+    """
+    registry = registry if registry is not None else DEFAULT_ZMANIM
+    key = (
+        date,
+        location.solar_profile,
+        location.diaspora,
+        candle_lighting_offset,
+        havdalah_offset,
+        registry.compile(),
+    )
+    return _DAY_TRANSITIONS.get(
+        key,
+        lambda _: _compute_day_transitions(
+            location, date, candle_lighting_offset, havdalah_offset, registry
+        ),
+    )
+
+
+def _compute_day_transitions(
+    location, date, candle_lighting_offset, havdalah_offset, registry
+):
+    """Compute the sorted transitions of a date."""
+    zmanim = Zmanim(
+        date,
+        location,
+        candle_lighting_offset=candle_lighting_offset,
+        havdalah_offset=havdalah_offset,
+        registry=registry,
+    )
+    durations = registry.durations
+    res = [
+        TRANSITION(time, "zman", name)
+        for name, time in zmanim.zmanim.items()
+        if name not in durations
+    ]
+
+    state = zmanim.day_state
+    if state.tomorrow_assur and not state.today_assur:
+        res.append(TRANSITION(state.candle_lighting, "melacha_start", None))
+    if state.today_assur and not state.tomorrow_assur:
+        res.append(TRANSITION(state.havdalah, "melacha_end", None))
+
+    # pylint: disable=protected-access
+    sunset = zmanim._shabbat_zman("sunset")
+    tomorrow = HDate(
+        gdate=date + datetime.timedelta(days=1), diaspora=location.diaspora
+    )
+    res.append(TRANSITION(sunset, "date", tomorrow.hdate))
+    if tomorrow.omer_day:
+        res.append(TRANSITION(sunset, "omer", tomorrow.omer_day))
+
+    return tuple(
+        sorted(res, key=lambda item: (item.time, TRANSITION_KINDS.index(item.kind)))
+    )
+
+
+def iter_transitions(location, moment, **kwargs):
+    """
+    Iterate over the transitions of a location strictly after moment.
+
+    moment is an aware datetime. The keyword arguments are the ones of
+    day_transitions(). Transitions of the same time are yielded in the order
+    of TRANSITION_KINDS.
+    """
+    one_day = datetime.timedelta(days=1)
+    # Times of a date may fall up to a day and a half after its UTC midnight.
+    date = moment.astimezone(location.timezone).date() - 2 * one_day
+    pending = []
+    counter = 0
+    while True:
+        for transition in day_transitions(location, date, **kwargs):
+            if transition.time > moment:
+                rank = TRANSITION_KINDS.index(transition.kind)
+                heapq.heappush(pending, (transition.time, rank, counter, transition))
+                counter += 1
+        date += one_day
+        # The transitions of a date are all after the UTC midnight starting
+        # the date before it.
+        horizon = datetime.datetime.combine(date - one_day, datetime.time())
+        horizon = horizon.replace(tzinfo=pytz.utc)
+        while pending and pending[0][0] < horizon:
+            yield heapq.heappop(pending)[3]
+
+
+def next_transition(location, moment, **kwargs):
+    """
+    Return the first TRANSITION of a location strictly after moment.
+
+    moment is an aware datetime. The keyword arguments are the ones of
+    day_transitions().
+    """
+    return next(iter_transitions(location, moment, **kwargs))
@@ -11,15 +11,296 @@ from __future__ import division
 import datetime as dt
 import logging
 import math
+from collections import OrderedDict, namedtuple
 
 import pytz
 
 from hdate import htables
-from hdate.common import BaseClass, Location
+from hdate.common import (
+    BaseClass,
+    Location,
+    get_day_offset,
+    get_timezone,
+    local_to_utc,
+    utc_to_local,
+)
 from hdate.date import HDate
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 _LOGGER = logging.getLogger(__name__)
 
+# Proleptic Gregorian ordinal of the Unix epoch, 1970-01-01.
+_EPOCH_ORDINAL = 719163
+
+SOLAR_DAY = namedtuple("SOLAR_DAY", "eqtime, decl, cos_decl, sin_decl, tan_decl")
+
+
+def _solar_day(day_of_year):
+    """
+    Return the SOLAR_DAY terms of a day of the year.
+
+    The equation of time (the difference between sun noon and clock noon, in
+    minutes) and the sun declination (in radians) only depend on the day of
+    the year, so they are shared by all locations.
+    """
+    # get radians of sun orbit around earth =)
+    gama = 2.0 * math.pi * ((day_of_year - 1) / 365.0)
+
+    # get the diff betwen suns clock and wall clock in minutes
+    eqtime = 229.18 * (
+        0.000075
+        + 0.001868 * math.cos(gama)
+        - 0.032077 * math.sin(gama)
+        - 0.014615 * math.cos(2.0 * gama)
+        - 0.040849 * math.sin(2.0 * gama)
+    )
+
+    # calculate suns declanation at the equater in radians
+    decl = (
+        0.006918
+        - 0.399912 * math.cos(gama)
+        + 0.070257 * math.sin(gama)
+        - 0.006758 * math.cos(2.0 * gama)
+        + 0.000907 * math.sin(2.0 * gama)
+        - 0.002697 * math.cos(3.0 * gama)
+        + 0.00148 * math.sin(3.0 * gama)
+    )
+    return SOLAR_DAY(eqtime, decl, math.cos(decl), math.sin(decl), math.tan(decl))
+
+
+# Solar terms indexed by the number of days since January 1
+SOLAR_TABLE = tuple(_solar_day(day_of_year) for day_of_year in range(366))
+
+
+ZMAN_DEFINITION = namedtuple("ZMAN_DEFINITION", "angle, setting, depends, func")
+PLAN_STEP = namedtuple("PLAN_STEP", "name, angle, setting, depends, func")
+EVALUATION_PLAN = namedtuple("EVALUATION_PLAN", "angles, steps")
+
+# Whether melacha is forbidden on a date and the following one, the first and
+# last dates of the Shabbat or Yom Tov stretch they belong to, and the times
+# of candle lighting and havdalah on the date.
+DAY_STATE = namedtuple(
+    "DAY_STATE",
+    "today_assur, tomorrow_assur, stretch_start, stretch_end, "
+    "candle_lighting, havdalah",
+)
+
+
+class ZmanimRegistry(object):
+    """
+    Registry of zmanim definitions.
+
+    Each zman is declared once, either as a sun angle or as a function of
+    other zmanim. The registry compiles into an evaluation plan solving every
+    distinct sun angle once, then computing the other zmanim arithmetically in
+    dependency order. All times are minutes from 00:00 (utc). Registering an
+    existing name replaces its definition.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._definitions = OrderedDict()
+        self._plan = None
+        self._record = None
+        self._durations = set()
+
+    def __contains__(self, name):
+        """Return whether a zman of the given name is registered."""
+        return name in self._definitions
+
+    @property
+    def names(self):
+        """Return the names of the registered zmanim."""
+        return tuple(self._definitions)
+
+    @property
+    def durations(self):
+        """Return the names of the zmanim which are durations, not times."""
+        return tuple(name for name in self._definitions if name in self._durations)
+
+    def copy(self):
+        """Return a new registry holding the same definitions."""
+        registry = ZmanimRegistry()
+        registry._definitions.update(self._definitions)
+        registry._durations.update(self._durations)
+        return registry
+
+    def _add(self, name, definition):
+        """Register a definition and drop the compiled plan."""
+        self._definitions[name] = definition
+        self._durations.discard(name)
+        self._plan = None
+        self._record = None
+
+    def add_angle(self, name, degrees, setting=False):
+        """
+        Register the time the sun is at the given angle from the zenith.
+
+        The angle is 90.833 for sunrise and sunset, and 90 plus the depression
+        below the horizon for dawn and nightfall opinions. The morning time is
+        used unless setting is True.
+        """
+        self._add(name, ZMAN_DEFINITION(degrees, setting, (), None))
+
+    def add_offset(self, name, base, minutes):
+        """Register a fixed number of minutes after (or before) another zman."""
+        self._add(name, ZMAN_DEFINITION(None, None, (base,), lambda x: x + minutes))
+
+    def add_proportional(self, name, start, end, fraction):
+        """
+        Register the given fraction of the way between two zmanim.
+
+        This defines shaot zmaniyot on any definition of the day, for example
+        the end of shema is a fraction of 3/12 from the start to the end of
+        the day.
+        """
+        self._add(
+            name,
+            ZMAN_DEFINITION(
+                None, None, (start, end), lambda x, y: x + (y - x) * fraction
+            ),
+        )
+
+    def add_formula(self, name, depends, func, duration=False):
+        """
+        Register the result of func called with the zmanim it depends on.
+
+        If duration is True, the result is a number of minutes, such as the
+        length of an hour, rather than a time of the day.
+        """
+        self._add(name, ZMAN_DEFINITION(None, None, tuple(depends), func))
+        if duration:
+            self._durations.add(name)
+
+    def record_type(self):
+        """
+        Return the namedtuple type with a field per registered zman.
+
+        Raises ValueError if a name is not usable as a field name.
+        """
+        if self._record is None:
+            try:
+                self._record = namedtuple("ZMANIM", list(self._definitions))
+            except ValueError as error:
+                raise ValueError(
+                    "Zmanim names must be identifiers to be used as fields: {}".format(
+                        error
+                    )
+                )
+        return self._record
+
+    def compile(self):
+        """Return the EVALUATION_PLAN of the registry, compiling it if needed."""
+        if self._plan is None:
+            self._plan = self._compile()
+        return self._plan
+
+    def _compile(self):
+        """Order the definitions so every zman follows its dependencies."""
+        steps = []
+        done = set()
+        in_progress = []
+
+        def visit(name):
+            if name in done:
+                return
+            if name in in_progress:
+                raise ValueError(
+                    "Circular zmanim definitions: {}".format(
+                        " -> ".join(in_progress + [name])
+                    )
+                )
+            if name not in self._definitions:
+                raise ValueError("Unknown zman: {}".format(name))
+            in_progress.append(name)
+            definition = self._definitions[name]
+            for dependency in definition.depends:
+                visit(dependency)
+            in_progress.pop()
+            done.add(name)
+            steps.append(PLAN_STEP(name, *definition))
+
+        for name in self._definitions:
+            visit(name)
+
+        angles = sorted(set(step.angle for step in steps if step.angle is not None))
+        return EVALUATION_PLAN(tuple(angles), tuple(steps))
+
+    def evaluate(self, solve):
+        """
+        Evaluate all the registered zmanim.
+
+        solve is called once with the list of sun angles to solve, and must
+        return a dictionary mapping each angle to its (rising, setting) times.
+        The times may be numbers or NumPy arrays.
+        """
+        plan = self.compile()
+        sun_times = solve(plan.angles)
+        res = {}
+        for step in plan.steps:
+            if step.angle is not None:
+                res[step.name] = sun_times[step.angle][step.setting]
+            else:
+                res[step.name] = step.func(*[res[name] for name in step.depends])
+        return res
+
+
+DEFAULT_ZMANIM = ZmanimRegistry()
+# sunset and rise time
+DEFAULT_ZMANIM.add_angle("sunrise", 90.833)
+DEFAULT_ZMANIM.add_angle("sunset", 90.833, setting=True)
+# shaa zmanit by gara, 1/12 of light time
+DEFAULT_ZMANIM.add_formula(
+    "sun_hour",
+    ("sunrise", "sunset"),
+    lambda sunrise, sunset: (sunset - sunrise) // 12,
+    duration=True,
+)
+DEFAULT_ZMANIM.add_formula(
+    "midday", ("sunrise", "sunset"), lambda sunrise, sunset: (sunset + sunrise) // 2
+)
+# times of the different sun angles
+DEFAULT_ZMANIM.add_angle("first_light", 106.1)
+DEFAULT_ZMANIM.add_angle("talit", 101.0)
+DEFAULT_ZMANIM.add_angle("first_stars", 96.0, setting=True)
+DEFAULT_ZMANIM.add_angle("three_stars", 98.5, setting=True)
+DEFAULT_ZMANIM.add_formula(
+    "plag_mincha", ("sunset", "sun_hour"), lambda sunset, hour: sunset - 1.25 * hour
+)
+DEFAULT_ZMANIM.add_formula(
+    "stars_out",
+    ("sunset", "sun_hour"),
+    lambda sunset, hour: sunset + 18.0 * hour / 60.0,
+)
+DEFAULT_ZMANIM.add_formula(
+    "small_mincha", ("sunrise", "sun_hour"), lambda sunrise, hour: sunrise + 9.5 * hour
+)
+DEFAULT_ZMANIM.add_formula(
+    "big_mincha", ("sunrise", "sun_hour"), lambda sunrise, hour: sunrise + 6.5 * hour
+)
+# shaa zmanit by mga, 1/12 of the time from first light to its evening mirror
+DEFAULT_ZMANIM.add_formula(
+    "mga_end_shma",
+    ("first_light", "midday"),
+    lambda first_light, midday: first_light + (midday - first_light) / 6 * 3.0,
+)
+DEFAULT_ZMANIM.add_formula(
+    "gra_end_shma", ("sunrise", "sun_hour"), lambda sunrise, hour: sunrise + hour * 3.0
+)
+DEFAULT_ZMANIM.add_formula(
+    "mga_end_tfila",
+    ("first_light", "midday"),
+    lambda first_light, midday: first_light + (midday - first_light) / 6 * 4.0,
+)
+DEFAULT_ZMANIM.add_formula(
+    "gra_end_tfila", ("sunrise", "sun_hour"), lambda sunrise, hour: sunrise + hour * 4.0
+)
+DEFAULT_ZMANIM.add_offset("midnight", "midday", 12 * 60.0)
+
 
 class Zmanim(BaseClass):
     """Return Jewish day times.
@@ -33,6 +314,8 @@ class Zmanim(BaseClass):
     property.
     """
 
+    _cached_attrs = ("_cache", "_cache_key")
+
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -41,10 +324,14 @@ class Zmanim(BaseClass):
         hebrew=True,
         candle_lighting_offset=18,
         havdalah_offset=0,
+        registry=None,
     ):
         """
         Initialize the Zmanim object.
 
+        The zmanim computed are the ones defined in the given ZmanimRegistry,
+        by default DEFAULT_ZMANIM.
+
         As the timezone is expected to be part of the location object, any
         tzinfo passed along is discarded. Essentially making the datetime
         object non-timezone aware.
@@ -53,10 +340,13 @@ class Zmanim(BaseClass):
         location object. After which it is transformed to UTC for all internal
         calculations.
         """
+        self._cache = {}
+        self._cache_key = None
         self.location = location
         self.hebrew = hebrew
         self.candle_lighting_offset = candle_lighting_offset
         self.havdalah_offset = havdalah_offset
+        self.registry = registry if registry is not None else DEFAULT_ZMANIM
 
         # If a non-timezone aware date is received, use timezone from location
         # to make it timezone aware and change to UTC for calculations.
@@ -76,16 +366,18 @@ class Zmanim(BaseClass):
             raise TypeError
 
         _LOGGER.debug("Resetting timezone to UTC for calculations")
-        self.time = location.timezone.localize(self.time).astimezone(pytz.utc)
+        self.time = local_to_utc(self.time, location.timezone)
 
     def __unicode__(self):
         """Return a Unicode representation of Zmanim."""
+        zmanim = self.zmanim
         return u"".join(
             [
                 u"{} - {}\n".format(
-                    zman.description[self.hebrew], self.zmanim[zman.zman].time()
+                    zman.description[self.hebrew], zmanim[zman.zman].time()
                 )
                 for zman in htables.ZMANIM
+                if zman.zman in zmanim
             ]
         )
 
@@ -99,54 +391,189 @@ class Zmanim(BaseClass):
             self.hebrew,
         )
 
+    def _cached(self, name, compute):
+        """
+        Return a memoized value, computing it on first use.
+
+        All memoized values are dropped once the date, the location or the
+        registry the zmanim are computed for have changed.
+        """
+        key = (self.date, self.location.solar_profile, self.registry.compile())
+        if key != self._cache_key:
+            self._cache = {}
+            self._cache_key = key
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
     @property
     def utc_zmanim(self):
         """Return a dictionary of the zmanim in UTC time format."""
+        return dict(self._cached("utc_zmanim", self._compute_utc_zmanim))
+
+    def _compute_utc_zmanim(self):
+        """Compute the zmanim in UTC time format."""
+        return self._utc_datetimes(self.get_utc_sun_time_full())
+
+    def _utc_datetimes(self, minutes):
+        """Convert minutes from 00:00 (utc) of the date to UTC datetimes."""
         basetime = dt.datetime.combine(self.date, dt.time()).replace(tzinfo=pytz.utc)
         _LOGGER.debug("Calculating UTC zmanim for %r", basetime)
         return {
             key: basetime + dt.timedelta(minutes=value)
-            for key, value in self.get_utc_sun_time_full().items()
+            for key, value in minutes.items()
+        }
+
+    def _local_datetimes(self, utc_zmanim):
+        """Convert UTC datetimes of the date to the location's timezone."""
+        timezone = self.location.timezone
+        return {
+            key: utc_to_local(value, timezone, self.date)
+            for key, value in utc_zmanim.items()
         }
 
     @property
     def zmanim(self):
         """Return a dictionary of the zmanim the object represents."""
-        return {
-            key: value.astimezone(self.location.timezone)
-            for key, value in self.utc_zmanim.items()
-        }
+        return dict(self._cached("zmanim", self._compute_zmanim))
+
+    def _compute_zmanim(self):
+        """Compute the zmanim in the location's timezone."""
+        return self._local_datetimes(
+            self._cached("utc_zmanim", self._compute_utc_zmanim)
+        )
+
+    def _shabbat_zman(self, name):
+        """
+        Return the local time of a zman the Shabbat times are based on.
+
+        Candle lighting and havdalah use sunset and three_stars as defined in
+        the registry, or in DEFAULT_ZMANIM if the registry lacks them.
+        """
+        if name in self.registry:
+            return self._cached("zmanim", self._compute_zmanim)[name]
+        return self._cached("default_zmanim", self._compute_default_zmanim)[name]
+
+    def _compute_default_zmanim(self):
+        """Compute the zmanim of DEFAULT_ZMANIM in the location's timezone."""
+        return self._local_datetimes(
+            self._utc_datetimes(self._evaluate(DEFAULT_ZMANIM))
+        )
+
+    def raw(self, epoch=False):
+        """
+        Return the zmanim as a namedtuple of numbers, without datetime objects.
+
+        The fields are the names of the zmanim in the registry. The values are
+        the minutes from the local midnight starting the date, or the seconds
+        since the Unix epoch if epoch is True. The registry durations are
+        lengths in minutes in both cases.
+        """
+        return self._cached(("raw", epoch), lambda: self._compute_raw(epoch))
+
+    def _compute_raw(self, epoch):
+        """Compute the zmanim as local minutes or epoch seconds."""
+        minutes = self._cached("utc_sun_times", self._compute_utc_sun_time_full)
+        durations = self.registry.durations
+        res = {key: value for key, value in minutes.items() if key in durations}
+        times = {key: value for key, value in minutes.items() if key not in durations}
+        record = self.registry.record_type()
+        if epoch:
+            base = (self.date.toordinal() - _EPOCH_ORDINAL) * 86400
+            res.update((key, base + value * 60.0) for key, value in times.items())
+            return record(**res)
+
+        timezone = self.location.timezone
+        offset = get_day_offset(timezone, self.date)
+        if offset.tzinfo is not None:
+            shift = offset.utcoffset.total_seconds() / 60.0
+            res.update((key, value + shift) for key, value in times.items())
+            return record(**res)
+
+        # The offset changes during the day, convert each time on its own.
+        basetime = dt.datetime.combine(self.date, dt.time())
+        utc_basetime = basetime.replace(tzinfo=pytz.utc)
+        for key, value in times.items():
+            local = utc_to_local(
+                utc_basetime + dt.timedelta(minutes=value), timezone, self.date
+            )
+            res[key] = (local.replace(tzinfo=None) - basetime).total_seconds() / 60.0
+        return record(**res)
 
     @property
-    def candle_lighting(self):
-        """Return the time for candle lighting, or None if not applicable."""
-        today = HDate(gdate=self.date, diaspora=self.location.diaspora)
-        tomorrow = HDate(
-            gdate=self.date + dt.timedelta(days=1), diaspora=self.location.diaspora
+    def day_state(self):
+        """
+        Return the DAY_STATE of the date, whether melacha is forbidden on it.
+
+        The state is memoized and shared by candle_lighting, havdalah and
+        issur_melacha_in_effect.
+        """
+        return self._cached(
+            (
+                "day_state",
+                self.location.diaspora,
+                self.candle_lighting_offset,
+                self.havdalah_offset,
+            ),
+            self._compute_day_state,
         )
 
+    def _compute_day_state(self):
+        """Classify the date and the following one, and compute their times."""
+        diaspora = self.location.diaspora
+        one_day = dt.timedelta(days=1)
+
+        def is_assur(date):
+            day = HDate(gdate=date, diaspora=diaspora)
+            return day.is_shabbat or day.is_yom_tov
+
+        today = is_assur(self.date)
+        tomorrow = is_assur(self.date + one_day)
+
+        stretch_start = stretch_end = None
+        if today or tomorrow:
+            stretch_start = self.date if today else self.date + one_day
+            while today and is_assur(stretch_start - one_day):
+                stretch_start -= one_day
+            stretch_end = self.date + one_day if tomorrow else self.date
+            while tomorrow and is_assur(stretch_end + one_day):
+                stretch_end += one_day
+
+        candle_lighting = havdalah = None
         # If today is a Yom Tov or Shabbat, and tomorrow is a Yom Tov or
         # Shabbat return the havdalah time as the candle lighting time.
-        if (today.is_yom_tov or today.is_shabbat) and (
-            tomorrow.is_yom_tov or tomorrow.is_shabbat
-        ):
-            return self._havdalah_datetime
-
+        # There is then no havdalah value for today. Technically, there is
+        # havdalah mikodesh l'kodesh, but that is represented in the
+        # candle_lighting value to avoid misuse of the havdalah API.
+        if today and tomorrow:
+            candle_lighting = self._havdalah_datetime
         # Otherwise, if today is Friday or erev Yom Tov, return candle
         # lighting.
-        if tomorrow.is_shabbat or tomorrow.is_yom_tov:
-            return self.zmanim["sunset"] - dt.timedelta(
+        elif tomorrow:
+            candle_lighting = self._shabbat_zman("sunset") - dt.timedelta(
                 minutes=self.candle_lighting_offset
             )
-        return None
+        elif today:
+            havdalah = self._havdalah_datetime
+
+        return DAY_STATE(
+            today, tomorrow, stretch_start, stretch_end, candle_lighting, havdalah
+        )
+
+    @property
+    def candle_lighting(self):
+        """Return the time for candle lighting, or None if not applicable."""
+        return self.day_state.candle_lighting
 
     @property
     def _havdalah_datetime(self):
         """Compute the havdalah time based on settings."""
         if self.havdalah_offset == 0:
-            return self.zmanim["three_stars"]
+            return self._shabbat_zman("three_stars")
         # Otherwise, use the offset.
-        return self.zmanim["sunset"] + dt.timedelta(minutes=self.havdalah_offset)
+        return self._shabbat_zman("sunset") + dt.timedelta(
+            minutes=self.havdalah_offset
+        )
 
     @property
     def havdalah(self):
@@ -158,38 +585,17 @@ class Zmanim(BaseClass):
         after today, the havdalah value is defined to be None (to avoid
         misleading the user that melacha is permitted).
         """
-        today = HDate(gdate=self.date, diaspora=self.location.diaspora)
-        tomorrow = HDate(
-            gdate=self.date + dt.timedelta(days=1), diaspora=self.location.diaspora
-        )
-
-        # If today is Yom Tov or Shabbat, and tomorrow is Yom Tov or Shabbat,
-        # then there is no havdalah value for today. Technically, there is
-        # havdalah mikodesh l'kodesh, but that is represented in the
-        # candle_lighting value to avoid misuse of the havdalah API.
-        if today.is_shabbat or today.is_yom_tov:
-            if tomorrow.is_shabbat or tomorrow.is_yom_tov:
-                return None
-            return self._havdalah_datetime
-        return None
+        return self.day_state.havdalah
 
     @property
     def issur_melacha_in_effect(self):
         """At the given time, return whether issur melacha is in effect."""
-        today = HDate(gdate=self.date, diaspora=self.location.diaspora)
-        tomorrow = HDate(
-            gdate=self.date + dt.timedelta(days=1), diaspora=self.location.diaspora
-        )
-
-        if (today.is_shabbat or today.is_yom_tov) and (
-            tomorrow.is_shabbat or tomorrow.is_yom_tov
-        ):
+        state = self.day_state
+        if state.today_assur and state.tomorrow_assur:
             return True
-        if (today.is_shabbat or today.is_yom_tov) and (self.time < self.havdalah):
+        if state.today_assur and (self.time < state.havdalah):
             return True
-        if (tomorrow.is_shabbat or tomorrow.is_yom_tov) and (
-            self.time > self.candle_lighting
-        ):
+        if state.tomorrow_assur and (self.time > state.candle_lighting):
             return True
 
         return False
@@ -202,107 +608,241 @@ class Zmanim(BaseClass):
         """
         Return the times in minutes from 00:00 (utc) for a given sun altitude.
 
-        This is done for a given sun altitude in sunrise `deg` degrees
-        This function only works for altitudes sun really is.
-        If the sun never gets to this altitude, the returned sunset and sunrise
-        values will be negative. This can happen in low altitude when latitude
-        is nearing the poles in winter times, the sun never goes very high in
-        the sky there.
-
-        Algorithm from
-        http://www.srrb.noaa.gov/highlights/sunrise/calcdetails.html
-        The low accuracy solar position equations are used.
-        These routines are based on Jean Meeus's book Astronomical Algorithms.
+        See solve_sun_altitudes for the details of the calculation.
         """
-        gama = 0  # location of sun in yearly cycle in radians
-        eqtime = 0  # difference betwen sun noon and clock noon
-        decl = 0  # sun declanation
-        hour_angle = 0  # solar hour angle
-        sunrise_angle = math.pi * deg / 180.0  # sun angle at sunrise/set
+        return solve_sun_altitudes(self.date, self.location, [deg])[deg]
 
-        # get the day of year
-        day_of_year = self.gday_of_year()
+    def get_utc_sun_time_full(self):
+        """Return a list of Jewish times for the given location."""
+        return dict(self._cached("utc_sun_times", self._compute_utc_sun_time_full))
 
-        # get radians of sun orbit around earth =)
-        gama = 2.0 * math.pi * ((day_of_year - 1) / 365.0)
+    def _compute_utc_sun_time_full(self):
+        """Compute the Jewish times in minutes from 00:00 (utc)."""
+        return self._evaluate(self.registry)
 
-        # get the diff betwen suns clock and wall clock in minutes
-        eqtime = 229.18 * (
-            0.000075
-            + 0.001868 * math.cos(gama)
-            - 0.032077 * math.sin(gama)
-            - 0.014615 * math.cos(2.0 * gama)
-            - 0.040849 * math.sin(2.0 * gama)
+    def _evaluate(self, registry):
+        """Evaluate the zmanim of a registry in minutes from 00:00 (utc)."""
+        return registry.evaluate(
+            lambda angles: solve_sun_altitudes(self.date, self.location, angles)
         )
 
-        # calculate suns declanation at the equater in radians
-        decl = (
-            0.006918
-            - 0.399912 * math.cos(gama)
-            + 0.070257 * math.sin(gama)
-            - 0.006758 * math.cos(2.0 * gama)
-            + 0.000907 * math.sin(2.0 * gama)
-            - 0.002697 * math.cos(3.0 * gama)
-            + 0.00148 * math.sin(3.0 * gama)
+    @classmethod
+    def for_range(cls, start, end, location=None, registry=None):
+        """
+        Return the zmanim of every day from start up to, but not including, end.
+
+        The result is columnar: a dictionary holding the list of dates under
+        "date", and for each zman the list of its times in minutes from 00:00
+        (utc) of each date. When NumPy is installed, the solar equations are
+        evaluated over all the days at once and the columns are NumPy arrays,
+        the dates being datetime64 values.
+        """
+        location = location if location is not None else Location()
+        registry = registry if registry is not None else DEFAULT_ZMANIM
+        if np is None:
+            return cls._for_range_fallback(start, end, location, registry)
+
+        dates = np.arange(start, end, dtype="datetime64[D]")
+        res = _utc_sun_time_full_array(
+            dates, location.latitude, location.longitude, registry
         )
+        res["date"] = dates
+        return res
+
+    @classmethod
+    def _for_range_fallback(cls, start, end, location, registry):
+        """Compute the zmanim of a range of days one day at a time."""
+        res = {"date": []}
+        date = start
+        while date < end:
+            res["date"].append(date)
+            zmanim = cls(date, location, registry=registry)
+            for key, value in zmanim.get_utc_sun_time_full().items():
+                res.setdefault(key, []).append(value)
+            date += dt.timedelta(days=1)
+        return res
+
+
+def solve_sun_altitudes(date, location, angles):
+    """
+    Return the times in minutes from 00:00 (utc) for the given sun altitudes.
+
+    The result maps each angle, given in degrees from the zenith (90.833 for
+    sunrise and sunset), to a (rising, setting) tuple. The terms shared by all
+    the angles are computed once, so every angle only costs an acos.
+    This function only works for altitudes sun really is.
+    If the sun never gets to an altitude, the returned sunset and sunrise
+    values will be negative. This can happen in low altitude when latitude
+    is nearing the poles in winter times, the sun never goes very high in
+    the sky there.
+
+    Algorithm from
+    http://www.srrb.noaa.gov/highlights/sunrise/calcdetails.html
+    The low accuracy solar position equations are used.
+    These routines are based on Jean Meeus's book Astronomical Algorithms.
+    """
+    # get the solar terms of the day of year
+    solar_day = SOLAR_TABLE[(date - dt.date(date.year, 1, 1)).days]
 
-        # we use radians, ratio is 2pi/360
-        latitude = math.pi * self.location.latitude / 180.0
+    # get the location terms, latitude is in radians
+    profile = location.solar_profile
+
+    cos_latitude_decl = profile.cos_latitude * solar_day.cos_decl
+    tan_latitude_decl = profile.tan_latitude * solar_day.tan_decl
+    noon = 720.0 - profile.longitude_minutes
+
+    res = {}
+    for deg in angles:
+        sunrise_angle = math.pi * deg / 180.0  # sun angle at sunrise/set
 
         # the sun real time diff from noon at sunset/rise in radians
         try:
             hour_angle = math.acos(
-                math.cos(sunrise_angle) / (math.cos(latitude) * math.cos(decl))
-                - math.tan(latitude) * math.tan(decl)
+                math.cos(sunrise_angle) / cos_latitude_decl - tan_latitude_decl
             )
         # check for too high altitudes and return negative values
         except ValueError:
-            return -720, -720
+            res[deg] = (-720, -720)
+            continue
 
         # we use minutes, ratio is 1440min/2pi
         hour_angle = 720.0 * hour_angle / math.pi
 
         # get sunset/rise times in utc wall clock in minutes from 00:00 time
-        # sunrise / sunset
-        longitude = self.location.longitude
-        return (
-            int(720.0 - 4.0 * longitude - hour_angle - eqtime),
-            int(720.0 - 4.0 * longitude + hour_angle - eqtime),
+        res[deg] = (
+            int(noon - hour_angle - solar_day.eqtime),
+            int(noon + hour_angle - solar_day.eqtime),
         )
+    return res
 
-    def get_utc_sun_time_full(self):
-        """Return a list of Jewish times for the given location."""
-        # sunset and rise time
-        sunrise, sunset = self._get_utc_sun_time_deg(90.833)
-
-        # shaa zmanit by gara, 1/12 of light time
-        sun_hour = (sunset - sunrise) // 12
-        midday = (sunset + sunrise) // 2
-
-        # get times of the different sun angles
-        first_light, _ = self._get_utc_sun_time_deg(106.1)
-        talit, _ = self._get_utc_sun_time_deg(101.0)
-        _, first_stars = self._get_utc_sun_time_deg(96.0)
-        _, three_stars = self._get_utc_sun_time_deg(98.5)
-        mga_sunhour = (midday - first_light) / 6
-
-        res = dict(
-            sunrise=sunrise,
-            sunset=sunset,
-            sun_hour=sun_hour,
-            midday=midday,
-            first_light=first_light,
-            talit=talit,
-            first_stars=first_stars,
-            three_stars=three_stars,
-            plag_mincha=sunset - 1.25 * sun_hour,
-            stars_out=sunset + 18.0 * sun_hour / 60.0,
-            small_mincha=sunrise + 9.5 * sun_hour,
-            big_mincha=sunrise + 6.5 * sun_hour,
-            mga_end_shma=first_light + mga_sunhour * 3.0,
-            gra_end_shma=sunrise + sun_hour * 3.0,
-            mga_end_tfila=first_light + mga_sunhour * 4.0,
-            gra_end_tfila=sunrise + sun_hour * 4.0,
-            midnight=midday + 12 * 60.0,
+
+class ZmanimMatrix(object):
+    """
+    Zmanim of many locations over a range of days.
+
+    Holds for each zman a matrix of minutes from 00:00 (utc), with one row per
+    location and one column per day. Times are only turned into timezone
+    aware datetime objects when asked for through localize().
+    """
+
+    def __init__(self, dates, timezones, minutes):
+        """Initialize the matrix from its dates, timezones and minutes."""
+        self.dates = dates
+        self.timezones = timezones
+        self.minutes = minutes
+
+    def __getitem__(self, zman):
+        """Return the matrix of minutes of the given zman."""
+        return self.minutes[zman]
+
+    def localize(self, zman, location_index, day_index):
+        """Return the zman of a location and day in the location's timezone."""
+        date = self.dates[day_index]
+        if not isinstance(date, dt.date):
+            date = date.tolist()
+        basetime = dt.datetime.combine(date, dt.time()).replace(tzinfo=pytz.utc)
+        minutes = self.minutes[zman][location_index][day_index]
+        return utc_to_local(
+            basetime + dt.timedelta(minutes=float(minutes)),
+            get_timezone(self.timezones[location_index]),
+            date,
         )
-        return res
+
+
+# pylint: disable=too-many-arguments
+def zmanim_matrix(latitudes, longitudes, timezones, start, end, registry=None):
+    """
+    Return the ZmanimMatrix of many locations for the days from start to end.
+
+    The locations are given as sequences of latitudes, longitudes and
+    timezones (names or tzinfo objects). The end date is excluded. When NumPy
+    is installed, the solar equations are evaluated as a single broadcast of
+    the locations against the days, and the matrices are 2-D NumPy arrays.
+    """
+    registry = registry if registry is not None else DEFAULT_ZMANIM
+    if np is None:
+        return _zmanim_matrix_fallback(
+            latitudes, longitudes, timezones, start, end, registry
+        )
+
+    dates = np.arange(start, end, dtype="datetime64[D]")
+    minutes = _utc_sun_time_full_array(
+        dates,
+        np.asarray(latitudes, dtype=float)[:, np.newaxis],
+        np.asarray(longitudes, dtype=float)[:, np.newaxis],
+        registry,
+    )
+    return ZmanimMatrix(dates, list(timezones), minutes)
+
+
+def _zmanim_matrix_fallback(latitudes, longitudes, timezones, start, end, registry):
+    """Compute the ZmanimMatrix one location at a time, using lists."""
+    minutes = {}
+    dates = []
+    for latitude, longitude in zip(latitudes, longitudes):
+        location = Location(latitude=latitude, longitude=longitude)
+        table = Zmanim.for_range(start, end, location, registry)
+        dates = table.pop("date")
+        for key, value in table.items():
+            minutes.setdefault(key, []).append(value)
+    return ZmanimMatrix(dates, list(timezones), minutes)
+
+
+def _utc_sun_time_full_array(dates, latitude, longitude, registry):
+    """
+    Return the Jewish times for an array of datetime64 dates.
+
+    The latitude and longitude are broadcast against the dates.
+    """
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+    solar_terms = _solar_terms_array(day_of_year)
+    return registry.evaluate(
+        lambda angles: {
+            deg: _utc_sun_time_deg_array(solar_terms, latitude, longitude, deg)
+            for deg in angles
+        }
+    )
+
+
+def _solar_terms_array(day_of_year):
+    """Return the equation of time and declination terms for days of the year."""
+    global _SOLAR_COLUMNS  # pylint: disable=global-statement
+    if _SOLAR_COLUMNS is None:
+        _SOLAR_COLUMNS = np.array(SOLAR_TABLE).T
+    eqtime, _, cos_decl, _, tan_decl = _SOLAR_COLUMNS[:, day_of_year]
+    return eqtime, cos_decl, tan_decl
+
+
+# Columns of SOLAR_TABLE as NumPy arrays, built on first use
+_SOLAR_COLUMNS = None
+
+
+def _utc_sun_time_deg_array(solar_terms, latitude, longitude, deg):
+    """
+    Return the sunrise and sunset arrays of minutes from 00:00 (utc).
+
+    Array version of Zmanim._get_utc_sun_time_deg, broadcasting the solar
+    terms against the latitudes and longitudes.
+    """
+    eqtime, cos_decl, tan_decl = solar_terms
+    sunrise_angle = math.pi * deg / 180.0
+    latitude = np.pi * latitude / 180.0
+
+    # the sun real time diff from noon at sunset/rise in radians, NaN where
+    # the sun never gets to this altitude
+    with np.errstate(invalid="ignore"):
+        hour_angle = np.arccos(
+            np.cos(sunrise_angle) / (np.cos(latitude) * cos_decl)
+            - np.tan(latitude) * tan_decl
+        )
+    never = np.isnan(hour_angle)
+
+    # we use minutes, ratio is 1440min/2pi
+    hour_angle = 720.0 * hour_angle / np.pi
+
+    sunrise = np.trunc(720.0 - 4.0 * longitude - hour_angle - eqtime)
+    sunset = np.trunc(720.0 - 4.0 * longitude + hour_angle - eqtime)
+    return (
+        np.where(never, -720, sunrise).astype(np.int64),
+        np.where(never, -720, sunset).astype(np.int64),
+    )
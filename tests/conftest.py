@@ -28,3 +28,18 @@ def random_date():
 def rand_hdate(random_date):
     """Given a random date, generate a random HDate."""
     return hdate.HDate(random_date)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "fallback"])
+def numpy(request, monkeypatch, numpy_module):
+    """
+    Run a test with NumPy, then with the pure Python fallback.
+
+    The fallback is forced by hiding NumPy from numpy_module, a fixture the
+    test module defines to return the module under test.
+    """
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(numpy_module, "np", None)
+    return request.param
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Test the asyncio transitions scheduler."""
+import datetime
+import itertools
+
+import pytest
+import pytz
+
+from hdate import Location, timeline
+
+aio = pytest.importorskip("hdate.aio")
+
+# pylint: disable=no-self-use
+# pylint-comment: In tests, classes are just a grouping semantic
+
+START = pytz.utc.localize(datetime.datetime(2021, 3, 25, 12))
+
+
+class FakeHandle(object):
+    def __init__(self, loop, when, callback):
+        self.loop = loop
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeLoop(object):
+    """Event loop whose time only moves when run_until is called."""
+
+    def __init__(self):
+        self.now = START
+        self.handles = []
+
+    def clock(self):
+        return self.now
+
+    def time(self):
+        return (self.now - START).total_seconds()
+
+    def call_at(self, when, callback):
+        handle = FakeHandle(self, when, callback)
+        self.handles.append(handle)
+        return handle
+
+    @property
+    def pending(self):
+        return [handle for handle in self.handles if not handle.cancelled]
+
+    def run_until(self, moment):
+        while self.pending:
+            handle = min(self.pending, key=lambda handle: handle.when)
+            when = START + datetime.timedelta(seconds=handle.when)
+            if when > moment:
+                break
+            self.now = when
+            handle.cancelled = True
+            handle.callback()
+        self.now = moment
+
+
+class TestTransitionScheduler(object):
+    LOCATIONS = [
+        Location(diaspora=True),
+        Location(timezone="America/New_York", latitude=40.7128, longitude=-74.006),
+    ]
+
+    def test_reports_transitions_in_order(self):
+        loop = FakeLoop()
+        calls = []
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS,
+            lambda location, transition: calls.append((location, transition)),
+            loop=loop,
+            clock=loop.clock,
+        )
+        scheduler.start()
+        assert len(loop.pending) == 1
+        end = START + datetime.timedelta(days=4)
+        loop.run_until(end)
+        assert len(loop.pending) == 1
+        assert scheduler.next_time > end
+
+        for location in self.LOCATIONS:
+            expected = list(
+                itertools.takewhile(
+                    lambda transition: transition.time <= end,
+                    timeline.iter_transitions(location, START),
+                )
+            )
+            assert [t for loc, t in calls if loc is location] == expected
+        times = [transition.time for _, transition in calls]
+        assert times == sorted(times)
+
+    def test_kinds(self):
+        loop = FakeLoop()
+        calls = []
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS[:1],
+            lambda location, transition: calls.append(transition),
+            kinds=("melacha_start", "melacha_end"),
+            loop=loop,
+            clock=loop.clock,
+        )
+        scheduler.start()
+        loop.run_until(START + datetime.timedelta(days=11))
+        assert [transition.kind for transition in calls] == [
+            "melacha_start",
+            "melacha_end",
+            "melacha_start",
+            "melacha_end",
+        ]
+        with pytest.raises(ValueError):
+            aio.TransitionScheduler(self.LOCATIONS, print, kinds=("sunrise",))
+        with pytest.raises(ValueError):
+            aio.TransitionScheduler(self.LOCATIONS, print, kinds=[])
+
+    def test_rare_kind(self):
+        loop = FakeLoop()
+        calls = []
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS[:1],
+            lambda location, transition: calls.append(transition),
+            kinds=["omer"],
+            loop=loop,
+            clock=loop.clock,
+        )
+        scheduler.start()
+        assert scheduler.next_time.date() == datetime.date(2021, 3, 28)
+
+    def test_stop(self):
+        loop = FakeLoop()
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS, lambda *args: None, loop=loop, clock=loop.clock
+        )
+        scheduler.start()
+        assert scheduler.running
+        scheduler.stop()
+        assert not scheduler.running
+        assert not loop.pending
+
+    def test_stop_from_callback(self):
+        loop = FakeLoop()
+        calls = []
+
+        def callback(location, transition):
+            calls.append(transition)
+            scheduler.stop()
+
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS, callback, loop=loop, clock=loop.clock
+        )
+        scheduler.start()
+        loop.run_until(START + datetime.timedelta(days=2))
+        assert len(calls) == 1
+        assert not scheduler.running
+        assert not loop.pending
+
+    def test_failing_callback(self):
+        loop = FakeLoop()
+        calls = []
+
+        def callback(location, transition):
+            calls.append(transition)
+            raise RuntimeError
+
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS[:1], callback, loop=loop, clock=loop.clock
+        )
+        scheduler.start()
+        loop.run_until(START + datetime.timedelta(days=1))
+        assert len(calls) > 1
+        assert scheduler.running
+
+    def test_asyncio_loop(self):
+        asyncio = pytest.importorskip("asyncio")
+        loop = asyncio.new_event_loop()
+        first = timeline.next_transition(self.LOCATIONS[0], START)
+        begin = loop.time()
+
+        def clock():
+            # Reach the first transition 50ms after the loop started.
+            elapsed = loop.time() - begin - 0.05
+            return first.time + datetime.timedelta(seconds=elapsed)
+
+        calls = []
+        scheduler = aio.TransitionScheduler(
+            self.LOCATIONS[:1],
+            lambda location, transition: (calls.append(transition), loop.stop()),
+            loop=loop,
+            clock=clock,
+        )
+        scheduler.start()
+        loop.run_forever()
+        scheduler.stop()
+        loop.close()
+        assert calls == [first]
+
+    def test_running_loop(self):
+        asyncio = pytest.importorskip("asyncio")
+        loop = asyncio.new_event_loop()
+        scheduler = aio.TransitionScheduler(self.LOCATIONS, lambda *args: None)
+        if hasattr(asyncio, "get_running_loop"):
+            with pytest.raises(RuntimeError):
+                scheduler.start()
+        loop.call_soon(scheduler.start)
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        assert scheduler.loop is loop
+        assert scheduler.running
+        scheduler.stop()
+        loop.close()
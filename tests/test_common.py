@@ -5,8 +5,9 @@ from __future__ import print_function
 import datetime  # noqa: F401
 
 import pytest
+import pytz
 
-from hdate import HDate, Location, Zmanim  # noqa: F401
+from hdate import HDate, Location, Zmanim, common  # noqa: F401
 
 # pylint: disable=no-self-use
 # pylint-comment: In tests, classes are just a grouping semantic
@@ -44,3 +45,114 @@ class TestClasses(object):
         copy_.foo = "bar"
         assert _class != copy_
         assert _class != "not a class instance"
+
+
+class TestLocation(object):
+    def test_solar_profile(self):
+        location = Location(latitude=45.0, longitude=-30.0)
+        profile = location.solar_profile
+        assert profile is location.solar_profile
+        assert profile.cos_latitude == pytest.approx(0.5 ** 0.5)
+        assert profile.tan_latitude == pytest.approx(1.0)
+        assert profile.longitude_minutes == -120.0
+        assert profile.tzinfo is location.timezone
+
+    @pytest.mark.parametrize(
+        "attribute, value",
+        [("latitude", 0.0), ("longitude", 0.0), ("timezone", "America/New_York")],
+    )
+    def test_solar_profile_invalidated(self, attribute, value):
+        location = Location(latitude=45.0, longitude=-30.0)
+        profile = location.solar_profile
+        setattr(location, attribute, value)
+        assert location.solar_profile != profile
+
+    def test_solar_profile_ignored_on_equality(self):
+        location = Location()
+        location.solar_profile  # pylint: disable=pointless-statement
+        assert location == Location()
+
+
+class TestDayOffset(object):
+    @pytest.mark.parametrize(
+        "timezone", ["Asia/Jerusalem", "America/New_York", "Australia/Lord_Howe"]
+    )
+    def test_matches_pytz(self, timezone):
+        tz = pytz.timezone(timezone)
+        date = datetime.date(2021, 1, 1)
+        while date < datetime.date(2022, 1, 1):
+            for minutes in range(-720, 2160, 97):
+                value = datetime.datetime.combine(date, datetime.time()).replace(
+                    tzinfo=pytz.utc
+                ) + datetime.timedelta(minutes=minutes)
+                local = common.utc_to_local(value, tz, date)
+                assert local == value.astimezone(tz)
+                assert local.tzinfo is value.astimezone(tz).tzinfo
+            naive = datetime.datetime.combine(date, datetime.time(1, 30))
+            expected = tz.localize(naive).astimezone(pytz.utc)
+            assert common.local_to_utc(naive, tz) == expected
+            date += datetime.timedelta(days=1)
+
+    def test_transition_day(self):
+        tz = pytz.timezone("America/New_York")
+        assert common.get_day_offset(tz, datetime.date(2021, 3, 14)).tzinfo is None
+        assert common.get_day_offset(tz, datetime.date(2021, 3, 1)).utcoffset == (
+            datetime.timedelta(hours=-5)
+        )
+
+    def test_offsets_are_cached(self):
+        tz = pytz.timezone("Asia/Jerusalem")
+        common.clear_offset_cache()
+        for _ in range(3):
+            date = datetime.datetime(2021, 6, 1, 12)
+            assert Zmanim(date, Location(timezone=tz)).zmanim
+        info = common.offset_cache_info()
+        assert info.misses == 1
+        assert info.currsize == 1
+
+
+class TestTimezoneBackend(object):
+    @pytest.fixture
+    def zoneinfo_backend(self):
+        pytest.importorskip("zoneinfo")
+        common.set_timezone_backend("zoneinfo")
+        yield
+        common.set_timezone_backend("pytz")
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            common.set_timezone_backend("dateutil")
+        assert common.get_timezone_backend() == "pytz"
+
+    def test_localize(self):
+        naive = datetime.datetime(2021, 7, 1, 12)
+        tz = pytz.timezone("Asia/Jerusalem")
+        assert common.localize(tz, naive).utcoffset() == datetime.timedelta(hours=3)
+        assert common.localize(pytz.utc, naive) == naive.replace(tzinfo=pytz.utc)
+
+    @pytest.mark.parametrize("timezone", ["Asia/Jerusalem", "America/New_York"])
+    def test_zoneinfo_matches_pytz(self, zoneinfo_backend, timezone):
+        location = Location(timezone=timezone)
+        assert not isinstance(location.timezone, pytz.BaseTzInfo)
+        expected_location = Location(timezone=pytz.timezone(timezone))
+        date = datetime.datetime(2021, 1, 1, 12)
+        while date.year == 2021:
+            zmanim = Zmanim(date, location).zmanim
+            expected = Zmanim(date, expected_location).zmanim
+            for key, value in expected.items():
+                assert zmanim[key].astimezone(pytz.utc) == value
+                assert zmanim[key].utcoffset() == value.utcoffset()
+            date += datetime.timedelta(days=5)
+
+    @pytest.mark.parametrize(
+        "naive",
+        [
+            # Repeated when DST ends, and skipped when it starts.
+            datetime.datetime(2020, 11, 1, 1, 30),
+            datetime.datetime(2021, 3, 14, 2, 30),
+        ],
+    )
+    def test_zoneinfo_transitions_match_pytz(self, zoneinfo_backend, naive):
+        location = Location(timezone="America/New_York")
+        expected = Zmanim(naive, Location(timezone=pytz.timezone("America/New_York")))
+        assert Zmanim(naive, location).time == expected.time
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """Test the conversion functions."""
+import datetime
+
 import pytest
 
 from hdate import converters as conv
@@ -77,3 +79,140 @@ class TestConverters(object):
         for day in range(1, days_in_month + 1):
             date = HebrewDate(year, Months.Kislev, day)
             assert conv.jdn_to_hdate(conv.hdate_to_jdn(date)) == date
+
+
+class TestYearCache(object):
+    def setup_method(self):
+        conv.set_year_cache_size(1024)
+        conv.clear_year_cache()
+
+    def teardown_method(self):
+        conv.set_year_cache_size(1024)
+
+    @pytest.mark.parametrize("year", [3761, 5749, 5753, 5780, 5781, 9999])
+    def test_year_info_matches_calculation(self, year):
+        info = conv.get_year_info(year)
+        assert info.days_from_3744 == conv._days_from_3744(year)
+        assert info.size == conv._days_from_3744(year + 1) - conv._days_from_3744(
+            year
+        )
+        assert info.jdn_tishrei1 == conv.hdate_to_jdn(
+            HebrewDate(year, Months.Tishrei, 1)
+        )
+
+    def test_hits_and_misses(self):
+        conv.get_year_info(5780)
+        conv.get_year_info(5780)
+        info = conv.year_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_cache_is_bounded(self):
+        conv.set_year_cache_size(2)
+        for year in range(5770, 5780):
+            conv.get_year_info(year)
+        assert conv.year_cache_info().currsize == 2
+        conv.set_year_cache_size(0)
+        assert conv.year_cache_info().currsize == 0
+
+    def test_negative_size(self):
+        with pytest.raises(ValueError):
+            conv.set_year_cache_size(-1)
+
+
+class TestTishreiTable(object):
+    def teardown_method(self):
+        conv.set_tishrei_table_range(*conv.TISHREI_TABLE_YEARS)
+
+    def test_table_matches_fallback(self, random_date):
+        jdn = conv.gdate_to_jdn(random_date)
+        with_table = conv.jdn_to_hdate(jdn)
+        conv.set_tishrei_table_range(None, None)
+        assert conv.jdn_to_hdate(jdn) == with_table
+
+    @pytest.mark.parametrize("year", [5000, 5001, 5002])
+    def test_year_boundaries(self, year):
+        conv.set_tishrei_table_range(5000, 5001)
+        rosh_hashana = conv.hdate_to_jdn(HebrewDate(year, Months.Tishrei, 1))
+        assert conv.jdn_to_hdate(rosh_hashana) == HebrewDate(year, Months.Tishrei, 1)
+        assert conv.jdn_to_hdate(rosh_hashana - 1) == HebrewDate(
+            year - 1, Months.Elul, 29
+        )
+
+    def test_bad_range(self):
+        with pytest.raises(ValueError):
+            conv.set_tishrei_table_range(5001, 5000)
+
+
+@pytest.fixture
+def numpy_module():
+    return conv
+
+
+class TestBatchGdateToHdate(object):
+    @pytest.mark.parametrize("execution_number", list(range(5)))
+    def test_matches_scalar(self, execution_number, numpy, random_date):
+        dates = [random_date + datetime.timedelta(days) for days in range(400)]
+        years, months, days = conv.batch_gdate_to_hdate(
+            [date.year for date in dates],
+            [date.month for date in dates],
+            [date.day for date in dates],
+        )
+        for date, year, month, day in zip(dates, years, months, days):
+            assert conv.jdn_to_hdate(conv.gdate_to_jdn(date)) == HebrewDate(
+                year, month, day
+            )
+
+    def test_datetime64(self, numpy):
+        dates = [datetime.date(2019, 10, 1), datetime.date(2020, 4, 9)]
+        if numpy:
+            import numpy as np
+
+            dates = np.array(dates, dtype="datetime64[D]")
+        years, months, days = conv.batch_datetime64_to_hdate(dates)
+        assert list(years) == [5780, 5780]
+        assert list(months) == [Months.Tishrei.value, Months.Nisan.value]
+        assert list(days) == [2, 15]
+
+
+class TestBatchHdateToGdate(object):
+    @pytest.mark.parametrize(
+        "year", TestConverters.YEARS_PSHUTA + TestConverters.YEARS_MEUBERET
+    )
+    def test_matches_scalar(self, numpy, year):
+        if conv.get_size_of_hebrew_year(year) > 355:
+            skipped = [Months.Adar]
+        else:
+            skipped = [Months.Adar_I, Months.Adar_II]
+        dates = [
+            HebrewDate(year, month, day)
+            for month in Months
+            if month not in skipped
+            for day in range(1, 30)
+        ]
+        jdns = conv.batch_hdate_to_jdn(
+            [date.year for date in dates],
+            [date.month for date in dates],
+            [date.day for date in dates],
+        )
+        assert list(jdns) == [conv.hdate_to_jdn(date) for date in dates]
+
+        years, months, days = conv.batch_jdn_to_gdate(jdns)
+        assert [
+            datetime.date(year, month, day)
+            for year, month, day in zip(years, months, days)
+        ] == [conv.jdn_to_gdate(jdn) for jdn in jdns]
+
+    def test_datetime64(self, numpy):
+        dates = conv.batch_hdate_to_datetime64(
+            [5780, 5779, 5779], [1, 13, 14], [2, 30, 14]
+        )
+        expected = [
+            datetime.date(2019, 10, 1),
+            datetime.date(2019, 3, 7),
+            datetime.date(2019, 3, 21),
+        ]
+        if numpy:
+            import numpy as np
+
+            expected = np.array(expected, dtype="datetime64[D]")
+        assert list(dates) == list(expected)
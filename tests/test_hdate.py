@@ -8,7 +8,7 @@ import random
 import pytest
 
 import hdate.converters as conv
-from hdate import HDate, HebrewDate
+from hdate import HDate, HebrewDate, HebrewYear
 from hdate.htables import Months
 
 # pylint: disable=no-self-use
@@ -135,6 +135,60 @@ class TestHDate(object):
         )
         assert (rand_hdate.next_day.gdate - rand_hdate.gdate) == datetime.timedelta(1)
 
+    def test_conversions_are_memoized(self, monkeypatch, random_date):
+        calls = []
+        jdn_to_hdate = conv.jdn_to_hdate
+
+        def counting_jdn_to_hdate(jdn):
+            calls.append(jdn)
+            return jdn_to_hdate(jdn)
+
+        monkeypatch.setattr(conv, "jdn_to_hdate", counting_jdn_to_hdate)
+        hd = HDate(random_date)
+        for _ in range(3):
+            assert hd.gdate == random_date
+            str(hd)
+        assert len(calls) == 1
+
+    def test_setters_invalidate_memoized_values(self, rand_hdate):
+        rand_hdate.gdate = datetime.date(2018, 12, 9)
+        assert rand_hdate.hdate == HebrewDate(5779, 4, 1)
+        rand_hdate.hdate = HebrewDate(5779, 3, 30)
+        assert rand_hdate.gdate == datetime.date(2018, 12, 8)
+        rand_hdate.gdate = datetime.date(2018, 12, 7)
+        assert rand_hdate.hdate == HebrewDate(5779, 3, 29)
+
+    def test_memoized_values_ignored_on_equality(self, random_date):
+        hd = HDate(random_date)
+        hd.gdate  # pylint: disable=pointless-statement
+        assert hd == HDate(random_date)
+
+
+class TestHebrewYear(object):
+    @pytest.mark.parametrize("year, info", list(HEBREW_YEARS_INFO.items()))
+    def test_year_facts(self, year, info):
+        hebrew_year = HebrewYear(year)
+        assert hebrew_year.rosh_hashana_dow == info[0]
+        assert hebrew_year.size == info[1]
+        assert hebrew_year.pesach_dow == info[2]
+        assert hebrew_year.is_leap == (info[1] > 355)
+        assert hebrew_year.short_kislev == (info[1] % 10 == 3)
+        assert hebrew_year.long_heshvan == (info[1] % 10 == 5)
+        assert hebrew_year.tishrei1_jdn == conv.hdate_to_jdn(
+            HebrewDate(year, Months.Tishrei, 1)
+        )
+
+    def test_interned(self, rand_hdate):
+        assert rand_hdate.hebrew_year is HebrewYear(rand_hdate.hdate.year)
+        first = HDate(heb_date=HebrewDate(5781, Months.Tishrei, 1))
+        last = HDate(heb_date=HebrewDate(5781, Months.Elul, 29))
+        assert first.gdate != last.gdate
+        assert first.hebrew_year is last.hebrew_year
+        assert HebrewYear(5780) != HebrewYear(5781)
+
+    def test_repr(self):
+        assert eval(repr(HebrewYear(5780))) is HebrewYear(5780)
+
 
 class TestSpecialDays(object):
 
@@ -372,6 +426,22 @@ class TestSpecialDays(object):
             else:
                 assert myhdate.holiday_name == holiday
 
+    @pytest.mark.parametrize("diaspora", [True, False])
+    def test_holiday_index_matches_holidays_for_year(self, diaspora, rand_hdate):
+        rand_hdate.diaspora = diaspora
+        day = HDate(
+            heb_date=HebrewDate(rand_hdate.hdate.year, Months.Tishrei, 1),
+            diaspora=diaspora,
+        )
+        while day.hdate.year == rand_hdate.hdate.year:
+            expected = [
+                holiday.name
+                for holiday, holiday_hdate in day.get_holidays_for_year()
+                if holiday_hdate.hdate == day.hdate
+            ]
+            assert [day.holiday_name] == (expected or [""])
+            day = day.next_day
+
     @pytest.mark.parametrize("execution_number", list(range(10)))
     def test_get_omer_day(self, execution_number, rand_hdate):
         if (
@@ -797,3 +867,19 @@ class TestHDateReading(object):
         mydate = HDate()
         mydate.hdate = HebrewDate(5779, Months.Elul, 29)
         assert mydate.get_reading() == 52
+
+    @pytest.mark.parametrize("diaspora", [True, False])
+    @pytest.mark.parametrize("year, parshiyot", READINGS_FOR_YEAR_DIASPORA[:4])
+    def test_parashot_for_year(self, year, parshiyot, diaspora):
+        mydate = HDate(heb_date=HebrewDate(year, 1, 1), diaspora=diaspora)
+        parashot = mydate.parashot_for_year()
+        if diaspora:
+            shabatot = [item for subl in parshiyot for item in subl]
+            assert [parasha for _, parasha in parashot][: len(shabatot)] == shabatot
+        for shabbat, parasha in parashot:
+            assert shabbat.weekday() == 5
+            assert HDate(shabbat, diaspora=diaspora).get_reading() == parasha
+        assert parashot[0][0] - mydate.gdate < datetime.timedelta(days=7)
+        assert mydate.hebrew_year.readings(diaspora) is HDate(
+            parashot[-1][0], diaspora=diaspora
+        ).hebrew_year.readings(diaspora)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Test the keviah calendar templates."""
+import datetime
+
+import pytest
+
+import hdate
+from hdate import HDate, HebrewDate, keviah
+from hdate.htables import Months
+
+# pylint: disable=no-self-use
+# pylint-comment: In tests, classes are just a grouping semantic
+
+
+class TestKeviah(object):
+    def test_fourteen_keviot(self):
+        assert len(set(keviah.keviah(year) for year in range(5600, 6000))) == 14
+
+    @pytest.mark.parametrize("diaspora", [True, False])
+    @pytest.mark.parametrize("year", [5708, 5709, 5763, 5764, 5779, 5780, 5784])
+    def test_matches_hdate(self, year, diaspora):
+        date = HDate(heb_date=HebrewDate(year, Months.Tishrei, 1)).gdate
+        end = HDate(heb_date=HebrewDate(year + 1, Months.Tishrei, 1)).gdate
+        while date < end:
+            expected = HDate(date, diaspora=diaspora)
+            day = keviah.get_day(date, diaspora)
+            assert (day.month, day.day) == (
+                expected.hdate.month,
+                expected.hdate.day,
+            )
+            assert day.dow == expected.dow
+            assert day.holiday.name == expected.holiday_name
+            assert day.parasha == expected.get_reading()
+            assert day.omer_day == expected.omer_day
+            date += datetime.timedelta(days=1)
+
+    def test_templates_are_shared(self):
+        assert keviah.keviah(5777) == keviah.keviah(5773)
+        assert keviah.get_template(5777) is keviah.get_template(5773)
+        assert keviah.get_template(5777) is not keviah.get_template(5777, True)
+
+
+class TestIterRange(object):
+    @pytest.mark.parametrize("diaspora", [True, False])
+    def test_matches_hdate(self, diaspora, random_date):
+        end = random_date + datetime.timedelta(days=800)
+        days = list(hdate.iter_range(random_date, end, diaspora=diaspora))
+        assert len(days) == 800
+        for day in days[::7]:
+            expected = HDate(day.gdate, diaspora=diaspora)
+            assert day.hdate == expected.hdate
+            assert day.jdn == expected._jdn
+            assert day.dow == expected.dow
+            assert day.holiday.name == expected.holiday_name
+            assert day.omer_day == expected.omer_day
+        assert [day.jdn for day in days] == list(
+            range(days[0].jdn, days[0].jdn + 800)
+        )
+
+    def test_empty_range(self, random_date):
+        assert list(hdate.iter_range(random_date, random_date)) == []
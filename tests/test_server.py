@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Test the HTTP JSON service."""
+import datetime
+import json
+
+import pytest
+
+from hdate import HDate, Location, Zmanim, server
+from hdate.server import HDateApp
+
+# pylint: disable=no-self-use
+# pylint-comment: In tests, classes are just a grouping semantic
+
+TODAY = datetime.date(2021, 3, 26)
+
+
+class Response(object):
+    def __init__(self, app, path, query="", **headers):
+        environ = {"PATH_INFO": path, "QUERY_STRING": query, "REQUEST_METHOD": "GET"}
+        environ.update(headers)
+        body = b"".join(app(environ, self.start_response))
+        self.json = json.loads(body.decode("utf-8")) if body else None
+
+    def start_response(self, status, headers):
+        self.code = int(status.split()[0])
+        self.headers = dict(headers)
+
+
+@pytest.fixture
+def app():
+    return HDateApp(today=lambda: TODAY)
+
+
+class TestServer(object):
+    def test_hdate(self, app):
+        response = Response(app, "/hdate", "date=2021-03-28&diaspora=1")
+        assert response.code == 200
+        assert response.json["hebrew_date"] == {
+            "year": 5781,
+            "month": "Nisan",
+            "day": 15,
+        }
+        assert response.json["holiday"] == HDate(
+            datetime.date(2021, 3, 28), diaspora=True
+        ).holiday_name
+        assert response.json["is_yom_tov"]
+
+    def test_default_date(self, app):
+        response = Response(app, "/hdate")
+        assert response.json["date"] == TODAY.isoformat()
+        assert response.headers["Last-Modified"] == "Fri, 26 Mar 2021 00:00:00 GMT"
+
+    def test_zmanim(self, app):
+        response = Response(
+            app,
+            "/zmanim",
+            "latitude=40.7128&longitude=-74.006&timezone=America/New_York",
+        )
+        location = Location(
+            latitude=40.7128, longitude=-74.006, timezone="America/New_York"
+        )
+        zmanim = Zmanim(TODAY, location)
+        assert response.json["zmanim"]["sunset"] == (
+            zmanim.zmanim["sunset"].isoformat()
+        )
+        assert response.json["candle_lighting"] == (
+            zmanim.candle_lighting.isoformat()
+        )
+        assert response.json["havdalah"] is None
+
+    def test_holidays(self, app):
+        response = Response(app, "/holidays", "year=5781&hebrew=1")
+        holidays = response.json["holidays"]
+        assert response.json["year"] == 5781
+        assert holidays[0]["name"] == "rosh_hashana_i"
+        assert holidays[0]["date"] == "2020-09-19"
+        assert holidays[0]["type"] == "YOM_TOV"
+        dates = [holiday["date"] for holiday in holidays]
+        assert dates == sorted(dates)
+
+    def test_parasha(self, app):
+        response = Response(app, "/parasha", "date=2021-03-24")
+        assert response.json == {
+            "date": "2021-03-24",
+            "shabbat": "2021-03-27",
+            "number": 25,
+            "parasha": "Tzav",
+        }
+
+    def test_errors(self, app):
+        assert Response(app, "/nothing").code == 404
+        assert Response(app, "/hdate", "date=tomorrow").code == 400
+        assert Response(app, "/hdate", "diaspora=yes").code == 400
+        assert Response(app, "/zmanim", "timezone=Mars/Olympus").code == 400
+        assert Response(app, "/zmanim", "latitude=north").code == 400
+        assert Response(app, "/parasha", "color=blue").code == 400
+        response = Response(app, "/hdate", REQUEST_METHOD="POST")
+        assert response.code == 405
+
+    @pytest.mark.parametrize(
+        "path, query",
+        [
+            ("/holidays", "year=1"),
+            ("/holidays", "year=20000"),
+            ("/zmanim", "date=0001-01-01"),
+            ("/parasha", "date=9999-12-31"),
+            ("/zmanim", "latitude=nan"),
+            ("/zmanim", "latitude=91"),
+            ("/zmanim", "longitude=-181"),
+            ("/zmanim", "longitude=inf"),
+            ("/zmanim", "havdalah_offset=-5"),
+        ],
+    )
+    def test_out_of_range(self, app, path, query):
+        response = Response(app, path, query)
+        assert response.code == 400
+        assert "error" in response.json
+
+    def test_range_limits(self, app):
+        for query in ("year={}".format(year) for year in server.YEAR_RANGE):
+            assert Response(app, "/holidays", query).code == 200
+        for date in server.DATE_RANGE:
+            query = "date={}".format(date.isoformat())
+            for path in ("/hdate", "/zmanim", "/holidays", "/parasha"):
+                assert Response(app, path, query).code == 200
+
+    def test_handler_errors(self, app, monkeypatch):
+        def failing(**kwargs):
+            raise KeyError("broken")
+
+        monkeypatch.setitem(server.HANDLERS, "/parasha", failing)
+        response = Response(app, "/parasha")
+        assert response.code == 500
+        assert response.json == {"error": "Internal error"}
+
+    def test_cache_and_conditional_requests(self, app):
+        first = Response(app, "/parasha", "date=2021-03-24&diaspora=0")
+        second = Response(app, "/parasha", "diaspora=0&date=2021-03-24")
+        assert second.json == first.json
+        assert app.cache.info().hits == 1
+        assert app.cache.info().misses == 1
+
+        etag = first.headers["ETag"]
+        response = Response(
+            app, "/parasha", "date=2021-03-24", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.code == 304
+        assert response.json is None
+        response = Response(
+            app, "/parasha", "date=2021-03-24", HTTP_IF_NONE_MATCH='"other"'
+        )
+        assert response.code == 200
+        response = Response(
+            app,
+            "/parasha",
+            "date=2021-03-24",
+            HTTP_IF_MODIFIED_SINCE=first.headers["Last-Modified"],
+        )
+        assert response.code == 304
+        response = Response(
+            app,
+            "/parasha",
+            "date=2021-03-25",
+            HTTP_IF_MODIFIED_SINCE=first.headers["Last-Modified"],
+        )
+        assert response.code == 200
+
+    def test_stats(self, app):
+        Response(app, "/hdate")
+        Response(app, "/hdate")
+        Response(app, "/nothing")
+        stats = Response(app, "/stats").json
+        assert stats["requests"] == {"/hdate": 2, "other": 1, "/stats": 1}
+        assert stats["response_cache"]["hits"] == 1
+        assert "year_cache" in stats
+        assert "offset_cache" in stats
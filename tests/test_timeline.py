@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Test the melacha timeline."""
+import datetime
+import itertools
+
+import pytest
+import pytz
+
+import hdate
+from hdate import HDate, Location, Zmanim
+from hdate import timeline as timeline_module
+from hdate import zmanim as zmanim_module
+
+# pylint: disable=no-self-use
+# pylint-comment: In tests, classes are just a grouping semantic
+
+
+class TestMelachaTimeline(object):
+    @pytest.mark.parametrize("diaspora", [True, False])
+    def test_matches_zmanim(self, diaspora):
+        location = Location(diaspora=diaspora)
+        start = datetime.date(2021, 3, 1)
+        end = datetime.date(2021, 5, 1)
+        timeline = hdate.melacha_timeline(location, start, end)
+        tz = location.timezone
+        moment = pytz.utc.localize(datetime.datetime(2021, 3, 1, 0, 7))
+        # The evening before end belongs to the stretches starting on end
+        while moment.date() < end - datetime.timedelta(days=1):
+            naive = moment.astimezone(tz).replace(tzinfo=None)
+            expected = Zmanim(naive, location).issur_melacha_in_effect
+            assert timeline.in_effect(moment) == expected
+            moment += datetime.timedelta(minutes=53)
+
+    def test_merged_stretch(self):
+        # Shabbat followed by the first days of Pesach 5781 in the diaspora
+        location = Location(diaspora=True)
+        timeline = hdate.melacha_timeline(
+            location, datetime.date(2021, 3, 27), datetime.date(2021, 3, 28)
+        )
+        assert len(timeline) == 1
+        start, end = list(timeline)[0]
+        assert start == Zmanim(datetime.date(2021, 3, 26), location).candle_lighting
+        assert end == Zmanim(datetime.date(2021, 3, 29), location).havdalah
+
+    def test_intervals_are_sorted(self):
+        timeline = hdate.melacha_timeline(
+            Location(), datetime.date(2021, 1, 1), datetime.date(2022, 1, 1)
+        )
+        for (_, end), (start, _) in zip(timeline, list(timeline)[1:]):
+            assert end < start
+
+    def test_interval_bounds(self):
+        timeline = hdate.melacha_timeline(
+            Location(), datetime.date(2021, 6, 5), datetime.date(2021, 6, 6)
+        )
+        start, end = timeline.interval_at(
+            pytz.utc.localize(datetime.datetime(2021, 6, 5, 12))
+        )
+        assert start in timeline
+        assert end not in timeline
+        assert timeline.interval_at(start - datetime.timedelta(seconds=1)) is None
+        assert timeline.interval_at(end) is None
+
+    @pytest.mark.parametrize(
+        "date", [datetime.date(2021, 6, 7), datetime.date(2021, 6, 5)]
+    )
+    def test_empty_range(self, date):
+        assert len(hdate.melacha_timeline(Location(), date, date)) == 0
+
+    def test_end_is_excluded(self):
+        # 2021-06-05 is a Shabbat, 2021-06-12 the next one
+        timeline = hdate.melacha_timeline(
+            Location(), datetime.date(2021, 6, 5), datetime.date(2021, 6, 12)
+        )
+        assert len(timeline) == 1
+
+
+class TestTransitions(object):
+    def test_sorted_and_strictly_after(self):
+        location = Location(timezone="America/New_York", diaspora=True)
+        moment = pytz.utc.localize(datetime.datetime(2021, 3, 10, 15, 30))
+        transitions = list(
+            itertools.islice(timeline_module.iter_transitions(location, moment), 300)
+        )
+        times = [transition.time for transition in transitions]
+        assert times == sorted(times)
+        assert times[0] > moment
+        assert hdate.next_transition(location, moment) == transitions[0]
+        assert not any(t.value == "sun_hour" for t in transitions)
+
+    def test_matches_melacha_timeline(self):
+        location = Location(diaspora=True)
+        start = pytz.utc.localize(datetime.datetime(2021, 3, 1))
+        end = pytz.utc.localize(datetime.datetime(2021, 4, 30, 12))
+        edges = []
+        for transition in timeline_module.iter_transitions(location, start):
+            if transition.time >= end:
+                break
+            if transition.kind in ("melacha_start", "melacha_end"):
+                edges.append(transition.time)
+        timeline = hdate.melacha_timeline(
+            location, datetime.date(2021, 3, 1), datetime.date(2021, 4, 30)
+        )
+        assert edges == [time for interval in timeline for time in interval]
+
+    def test_date_and_omer(self):
+        location = Location()
+        moment = pytz.utc.localize(datetime.datetime(2021, 3, 28, 12))
+        transitions = list(
+            itertools.islice(timeline_module.iter_transitions(location, moment), 100)
+        )
+        dates = [t for t in transitions if t.kind == "date"]
+        omer = [t for t in transitions if t.kind == "omer"]
+        zmanim = Zmanim(datetime.date(2021, 3, 28), location)
+        assert dates[0].time == zmanim.zmanim["sunset"]
+        assert dates[0].value == HDate(datetime.date(2021, 3, 29)).hdate
+        assert [t.time for t in omer] == [t.time for t in dates]
+        assert [t.value for t in omer] == list(range(1, len(omer) + 1))
+
+    def test_day_transitions_are_cached(self):
+        location = Location()
+        date = datetime.date(2021, 6, 1)
+        first = timeline_module.day_transitions(location, date)
+        assert timeline_module.day_transitions(Location(), date) is first
+        assert timeline_module.day_transitions(location, date, 40) is not first
+
+    def test_registry_without_shabbat_zmanim(self):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_angle("alot_19_8", 109.8)
+        location = Location()
+        friday_noon = pytz.utc.localize(datetime.datetime(2021, 6, 4, 9))
+        transition = hdate.next_transition(location, friday_noon, registry=registry)
+        assert transition.kind == "melacha_start"
+        assert transition.time == (
+            Zmanim(datetime.date(2021, 6, 4), location).candle_lighting
+        )
+
+    def test_registry_durations(self):
+        registry = zmanim_module.DEFAULT_ZMANIM.copy()
+        registry.add_proportional("mga_hour_start", "first_light", "sunset", 0)
+        registry.add_formula(
+            "mga_hour",
+            ("first_light", "three_stars"),
+            lambda start, end: (end - start) / 12.0,
+            duration=True,
+        )
+        assert registry.durations == ("sun_hour", "mga_hour")
+        moment = pytz.utc.localize(datetime.datetime(2021, 6, 1, 12))
+        values = [
+            transition.value
+            for transition in itertools.islice(
+                timeline_module.iter_transitions(
+                    Location(), moment, registry=registry
+                ),
+                50,
+            )
+        ]
+        assert "mga_hour_start" in values
+        assert "mga_hour" not in values
+        assert "sun_hour" not in values
@@ -1,4 +1,5 @@
 import datetime
+import math
 import random
 from calendar import isleap
 from datetime import datetime as dt
@@ -7,11 +8,13 @@ import pytest
 import pytz
 
 from hdate import Zmanim
+from hdate import zmanim as zmanim_module
 from hdate.common import Location
 
 # pylint: disable=no-self-use
 # pylint-comment: In tests, classes are just a grouping semantic
 
+EPOCH = pytz.utc.localize(dt(1970, 1, 1))
 NYC_LAT = 40.7128
 NYC_LNG = -74.0060
 
@@ -149,3 +152,286 @@ class TestZmanim(object):
             actual = actual.replace(tzinfo=None)
         assert actual == havdalah
         assert zmanim.issur_melacha_in_effect == melacha_assur
+
+    def test_zmanim_are_memoized(self, monkeypatch):
+        calls = []
+        solve_sun_altitudes = zmanim_module.solve_sun_altitudes
+
+        def counting_solve_sun_altitudes(date, location, angles):
+            calls.append(date)
+            return solve_sun_altitudes(date, location, angles)
+
+        monkeypatch.setattr(
+            zmanim_module, "solve_sun_altitudes", counting_solve_sun_altitudes
+        )
+        zmanim = Zmanim(date=datetime.date(2018, 9, 8), location=Location())
+        str(zmanim)
+        first = zmanim.zmanim
+        assert zmanim.utc_zmanim["sunset"] == first["sunset"]
+        assert len(calls) == 1
+
+        zmanim.date = datetime.date(2018, 9, 9)
+        assert zmanim.zmanim["sunset"] != first["sunset"]
+        zmanim.location.latitude = NYC_LAT
+        assert zmanim.zmanim["sunset"] != first["sunset"]
+        assert len(calls) == 3
+
+    @pytest.mark.parametrize("latitude", [31.778, NYC_LAT, 69.6])
+    def test_solve_sun_altitudes(self, random_date, latitude):
+        location = Location(latitude=latitude, longitude=NYC_LNG)
+        zmanim = Zmanim(random_date, location)
+        angles = [90.833, 96.0, 97.083, 98.5, 101.0, 106.1, 108.0]
+        sun_times = zmanim_module.solve_sun_altitudes(random_date, location, angles)
+        assert sorted(sun_times) == sorted(angles)
+        for angle in angles:
+            rising, setting = sun_times[angle]
+            assert (rising, setting) == zmanim._get_utc_sun_time_deg(angle)
+            assert rising <= setting
+
+    def test_sun_never_reaches_altitude(self):
+        location = Location(latitude=69.6, longitude=18.9)
+        sun_times = zmanim_module.solve_sun_altitudes(
+            datetime.date(2020, 6, 21), location, [106.1, 90.833]
+        )
+        assert sun_times == {106.1: (-720, -720), 90.833: (-720, -720)}
+
+    def test_solar_table(self):
+        assert len(zmanim_module.SOLAR_TABLE) == 366
+        for day_of_year in [0, 79, 172, 365]:
+            solar_day = zmanim_module.SOLAR_TABLE[day_of_year]
+            assert solar_day == zmanim_module._solar_day(day_of_year)
+            assert solar_day.cos_decl == pytest.approx(math.cos(solar_day.decl))
+            assert solar_day.sin_decl == pytest.approx(math.sin(solar_day.decl))
+        # The declination is highest around the summer solstice
+        highest = max(range(366), key=lambda day: zmanim_module.SOLAR_TABLE[day].decl)
+        assert 170 <= highest <= 175
+
+    @pytest.mark.parametrize(
+        "day, today, tomorrow, stretch",
+        [
+            (25, False, False, None),
+            (26, False, True, (27, 29)),
+            (27, True, True, (27, 29)),
+            (29, True, False, (27, 29)),
+        ],
+    )
+    def test_day_state(self, day, today, tomorrow, stretch):
+        # Shabbat followed by the first days of Pesach 5781 in the diaspora
+        zmanim = Zmanim(dt(2021, 3, day, 12), Location(diaspora=True))
+        state = zmanim.day_state
+        assert (state.today_assur, state.tomorrow_assur) == (today, tomorrow)
+        if stretch is None:
+            assert state.stretch_start is state.stretch_end is None
+        else:
+            assert (state.stretch_start.day, state.stretch_end.day) == stretch
+        assert state.candle_lighting == zmanim.candle_lighting
+        assert state.havdalah == zmanim.havdalah
+
+    def test_day_state_is_memoized(self, monkeypatch):
+        zmanim = Zmanim(dt(2021, 3, 26, 20), Location(diaspora=True))
+        calls = []
+        original = zmanim_module.HDate
+
+        def counting_hdate(*args, **kwargs):
+            calls.append(args)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(zmanim_module, "HDate", counting_hdate)
+        assert zmanim.issur_melacha_in_effect
+        count = len(calls)
+        assert zmanim.candle_lighting is not None
+        assert zmanim.havdalah is None
+        assert zmanim.issur_melacha_in_effect
+        assert len(calls) == count
+        zmanim.havdalah_offset = 42
+        assert zmanim.issur_melacha_in_effect
+        assert len(calls) > count
+
+    @pytest.mark.parametrize("timezone", ["Asia/Jerusalem", "America/New_York"])
+    def test_raw(self, timezone):
+        location = Location(latitude=NYC_LAT, longitude=NYC_LNG, timezone=timezone)
+        # A regular day and the days of the DST changes in New York
+        for date in [
+            datetime.date(2021, 6, 1),
+            datetime.date(2021, 3, 14),
+            datetime.date(2021, 11, 7),
+        ]:
+            zmanim = Zmanim(date, location)
+            local = zmanim.raw()
+            epoch = zmanim.raw(epoch=True)
+            assert local._fields == zmanim_module.DEFAULT_ZMANIM.names
+            midnight = datetime.datetime.combine(date, datetime.time())
+            for key, value in zmanim.zmanim.items():
+                if key in zmanim_module.DEFAULT_ZMANIM.durations:
+                    continue
+                naive = value.replace(tzinfo=None)
+                assert getattr(local, key) == pytest.approx(
+                    (naive - midnight).total_seconds() / 60.0
+                )
+                assert getattr(epoch, key) == pytest.approx(
+                    (value - EPOCH).total_seconds()
+                )
+            # Durations are lengths in minutes, not times of the day
+            sun_hour = zmanim.get_utc_sun_time_full()["sun_hour"]
+            assert local.sun_hour == epoch.sun_hour == sun_hour
+            assert 40 < sun_hour < 80
+            assert zmanim.raw() is local
+
+    def test_raw_custom_registry(self):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_angle("sunset", 90.833, setting=True)
+        registry.add_offset("rabeinu_tam", "sunset", 72)
+        raw = Zmanim(datetime.date(2021, 6, 1), registry=registry).raw()
+        assert raw._fields == ("sunset", "rabeinu_tam")
+        assert raw.rabeinu_tam == raw.sunset + 72
+
+    def test_raw_with_invalid_names(self):
+        registry = zmanim_module.DEFAULT_ZMANIM.copy()
+        registry.add_angle("alot 16.1", 106.1)
+        zmanim = Zmanim(datetime.date(2021, 6, 1), registry=registry)
+        assert "alot 16.1" in zmanim.zmanim
+        assert zmanim.candle_lighting is None
+        with pytest.raises(ValueError, match="identifiers"):
+            zmanim.raw()
+
+
+class TestZmanimRegistry(object):
+    def test_default_registry(self):
+        assert set(zmanim_module.DEFAULT_ZMANIM.names) == set(
+            Zmanim(datetime.date(2020, 1, 1)).get_utc_sun_time_full()
+        )
+        assert zmanim_module.DEFAULT_ZMANIM.compile().angles == (
+            90.833,
+            96.0,
+            98.5,
+            101.0,
+            106.1,
+        )
+
+    def test_custom_opinions(self, random_date):
+        registry = zmanim_module.DEFAULT_ZMANIM.copy()
+        registry.add_offset("rabeinu_tam", "sunset", 72)
+        registry.add_angle("alot_19_8", 109.8)
+        registry.add_proportional("mga_72_end_shma", "first_light_72", "stars_72", 0.25)
+        registry.add_offset("first_light_72", "sunrise", -72)
+        registry.add_offset("stars_72", "sunset", 72)
+        location = Location(latitude=NYC_LAT, longitude=NYC_LNG)
+        times = Zmanim(random_date, location, registry=registry)
+        times = times.get_utc_sun_time_full()
+        default = Zmanim(random_date, location).get_utc_sun_time_full()
+        assert all(times[key] == value for key, value in default.items())
+        assert times["rabeinu_tam"] == default["sunset"] + 72
+        assert times["alot_19_8"] < default["first_light"]
+        assert times["mga_72_end_shma"] == (
+            default["sunrise"] - 72 + (default["sunset"] - default["sunrise"] + 144) / 4
+        )
+        assert "rabeinu_tam" not in zmanim_module.DEFAULT_ZMANIM
+
+    def test_shabbat_times_without_sunset(self):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_angle("alot_19_8", 109.8)
+        location = Location(latitude=NYC_LAT, longitude=NYC_LNG)
+        for day in (26, 27):
+            date = dt(2021, 3, day, 12)
+            custom = Zmanim(date, location, registry=registry)
+            expected = Zmanim(date, location)
+            assert custom.day_state == expected.day_state
+            assert custom.issur_melacha_in_effect == expected.issur_melacha_in_effect
+            assert set(custom.zmanim) == {"alot_19_8"}
+
+    def test_angles_are_solved_once(self, monkeypatch):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_angle("sunrise", 90.833)
+        registry.add_angle("sunset", 90.833, setting=True)
+        registry.add_offset("before_sunrise", "sunrise", -10)
+        calls = []
+
+        def solve(angles):
+            calls.append(angles)
+            return {angle: (300, 1000) for angle in angles}
+
+        assert registry.evaluate(solve) == {
+            "sunrise": 300,
+            "sunset": 1000,
+            "before_sunrise": 290,
+        }
+        assert calls == [(90.833,)]
+
+    def test_replacing_invalidates_plan(self):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_angle("sunrise", 90.833)
+        plan = registry.compile()
+        assert registry.compile() is plan
+        registry.add_angle("sunrise", 91.0)
+        assert registry.compile().angles == (91.0,)
+
+    def test_unknown_dependency(self):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_offset("late", "missing", 10)
+        with pytest.raises(ValueError):
+            registry.compile()
+
+    def test_circular_dependency(self):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_offset("first", "second", 10)
+        registry.add_offset("second", "first", 10)
+        with pytest.raises(ValueError):
+            registry.compile()
+
+
+@pytest.fixture
+def numpy_module():
+    return zmanim_module
+
+
+class TestZmanimForRange(object):
+    @pytest.mark.parametrize(
+        "latitude, longitude", [(31.778, 35.235), (NYC_LAT, NYC_LNG), (69.6, 18.9)]
+    )
+    def test_matches_zmanim(self, numpy, random_date, latitude, longitude):
+        location = Location(latitude=latitude, longitude=longitude)
+        end = random_date + datetime.timedelta(days=60)
+        table = Zmanim.for_range(random_date, end, location)
+        assert len(table["date"]) == 60
+        for index, date in enumerate(list(table["date"])):
+            if numpy:
+                date = date.tolist()
+            for key, value in Zmanim(date, location).get_utc_sun_time_full().items():
+                assert table[key][index] == value
+
+    def test_custom_registry(self, numpy):
+        registry = zmanim_module.ZmanimRegistry()
+        registry.add_angle("sunset", 90.833, setting=True)
+        registry.add_offset("rabeinu_tam", "sunset", 72)
+        start = datetime.date(2020, 1, 1)
+        table = Zmanim.for_range(start, datetime.date(2020, 1, 8), registry=registry)
+        assert set(table) == {"date", "sunset", "rabeinu_tam"}
+        for sunset, rabeinu_tam in zip(table["sunset"], table["rabeinu_tam"]):
+            assert rabeinu_tam == sunset + 72
+
+
+class TestZmanimMatrix(object):
+    LOCATIONS = [
+        (31.778, 35.235, "Asia/Jerusalem"),
+        (NYC_LAT, NYC_LNG, "America/New_York"),
+        (51.5074, -0.1278, pytz.timezone("Europe/London")),
+    ]
+
+    def test_matches_zmanim(self, numpy):
+        start = datetime.date(2020, 3, 1)
+        matrix = zmanim_module.zmanim_matrix(
+            *zip(*self.LOCATIONS), start=start, end=datetime.date(2020, 4, 15)
+        )
+        assert len(matrix["sunset"]) == len(self.LOCATIONS)
+        for row, (latitude, longitude, timezone) in enumerate(self.LOCATIONS):
+            location = Location(
+                latitude=latitude, longitude=longitude, timezone=timezone
+            )
+            for column in range(0, 45, 4):
+                date = start + datetime.timedelta(days=column)
+                zmanim = Zmanim(date, location)
+                for key, value in zmanim.get_utc_sun_time_full().items():
+                    assert matrix[key][row][column] == value
+                localized = matrix.localize("sunset", row, column)
+                assert localized == zmanim.zmanim["sunset"]
+                assert localized.utcoffset() == zmanim.zmanim["sunset"].utcoffset()